@@ -5,29 +5,56 @@ This package provides streaming browser automation services built on top of brow
 using Google's Gemini model for AI-powered web automation with real-time SSE streaming.
 """
 
-from .llm_factory import get_llm, DEFAULT_MODEL
-from .streaming import (
-    StreamingSession,
-    StreamEvent,
-    LogLevel,
-    EventType,
-    create_session,
-    remove_session,
-    get_session,
-    create_step_callback,
-    create_done_callback,
-)
-
-
-# Lazy import to avoid circular dependency with ui_testing_agent
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .llm_factory import get_llm, DEFAULT_MODEL
+    from .streaming import (
+        StreamingSession,
+        StreamEvent,
+        LogLevel,
+        EventType,
+        create_session,
+        remove_session,
+        get_session,
+        create_step_callback,
+        create_done_callback,
+    )
+    from .streaming_runner import StreamingAgentRunner, get_streaming_runner
+
+
+# Exported name -> submodule. Submodules are imported on first attribute access
+# (PEP 562) so that importing the package does not pull in browser-use and the
+# LLM SDKs, and so that streaming_runner does not create a circular import with
+# ui_testing_agent.
+_LAZY = {
+    # LLM
+    "get_llm": ".llm_factory",
+    "DEFAULT_MODEL": ".llm_factory",
+    # Streaming
+    "StreamingSession": ".streaming",
+    "StreamEvent": ".streaming",
+    "LogLevel": ".streaming",
+    "EventType": ".streaming",
+    "create_session": ".streaming",
+    "remove_session": ".streaming",
+    "get_session": ".streaming",
+    "create_step_callback": ".streaming",
+    "create_done_callback": ".streaming",
+    # Runner
+    "StreamingAgentRunner": ".streaming_runner",
+    "get_streaming_runner": ".streaming_runner",
+}
+
+
 def __getattr__(name):
-    if name == "StreamingAgentRunner":
-        from .streaming_runner import StreamingAgentRunner
-        return StreamingAgentRunner
-    elif name == "get_streaming_runner":
-        from .streaming_runner import get_streaming_runner
-        return get_streaming_runner
-    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
 
 
 __all__ = [
@@ -5,15 +5,63 @@ This module has NO dependencies on other project modules to avoid circular impor
 All code requiring an LLM should import from here.
 """
 
+import asyncio
+import importlib.util
 import os
-from typing import Optional
+import time
+from typing import Dict, Optional
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Handle API key naming (GEMINI_API_KEY -> GOOGLE_API_KEY) for SDKs that read the env directly
+if os.getenv("GEMINI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
+    os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
+
 # Default model to use across all services
 DEFAULT_MODEL = "gemini-3-pro-preview"
 
+# API keys, read once at import (see reload_env)
+_ENV_GEMINI_KEY: Optional[str] = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+_ENV_OPENAI_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
+_ENV_ANTHROPIC_KEY: Optional[str] = os.getenv("ANTHROPIC_API_KEY")
+
+
+def reload_env() -> None:
+    """
+    Re-read API keys from the environment / .env file.
+
+    Keys are captured once at import time; call this after changing them at
+    runtime (e.g. in tests).
+    """
+    global _ENV_GEMINI_KEY, _ENV_OPENAI_KEY, _ENV_ANTHROPIC_KEY
+    load_dotenv()
+    _ENV_GEMINI_KEY = os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
+    _ENV_OPENAI_KEY = os.getenv("OPENAI_API_KEY")
+    _ENV_ANTHROPIC_KEY = os.getenv("ANTHROPIC_API_KEY")
+    _RATE_LIMITERS.clear()
+    _CONCURRENCY_LIMITS.clear()
+
+
+# Provider -> chat model class, resolved on first use
+_PROVIDER_CACHE: Dict[str, type] = {}
+
+
+def _load_provider(provider: str) -> type:
+    """Import a provider's chat model class once and cache it."""
+    cls = _PROVIDER_CACHE.get(provider)
+    if cls is None:
+        if provider == "google":
+            from browser_use import ChatGoogle as cls
+        elif provider == "openai":
+            from browser_use.llm.openai.chat import ChatOpenAI as cls
+        elif provider == "anthropic":
+            from browser_use.llm.anthropic.chat import ChatAnthropic as cls
+        else:
+            raise ValueError(f"Unknown LLM provider: {provider}")
+        _PROVIDER_CACHE[provider] = cls
+    return cls
+
 
 def get_llm(model: str = DEFAULT_MODEL, temperature: float = 1, api_key: Optional[str] = None):
     """
@@ -22,6 +70,10 @@ def get_llm(model: str = DEFAULT_MODEL, temperature: float = 1, api_key: Optiona
     Automatically detects the provider based on model name and returns the appropriate
     LLM class from browser-use.
 
+    Every call returns a new instance: browser-use's Agent patches ainvoke on
+    the LLM it is given (token cost tracking), so instances must not be shared
+    between agents. What is shared is the HTTP connection pool underneath.
+
     Args:
         model: Model name (e.g., "gemini-3-pro-preview", "gpt-4o", "claude-3-opus")
         temperature: Creativity/randomness of responses (0.0-1.0)
@@ -34,28 +86,256 @@ def get_llm(model: str = DEFAULT_MODEL, temperature: float = 1, api_key: Optiona
         - Gemini/Gemma: Uses GEMINI_API_KEY or GOOGLE_API_KEY
         - GPT: Uses OPENAI_API_KEY
         - Claude: Uses ANTHROPIC_API_KEY
+
+    Rate limiting:
+        Set GEMINI_RPM / GEMINI_TPM (or OPENAI_*, ANTHROPIC_*) to share one
+        requests/tokens-per-minute budget across every LLM of that provider.
+        GEMINI_MAX_CONCURRENCY (etc.) caps how many calls are in flight at once.
+    """
+    return _create_llm(model, temperature, api_key)
+
+
+# (model name substring, provider) - first match wins, anything else uses Gemini.
+# Substrings rather than prefixes: real IDs include "chatgpt-4o-latest",
+# "ft:gpt-4o-mini:org::id" and "us.anthropic.claude-3-..."
+_PROVIDER_MARKERS = (
+    ("gemini", "google"),
+    ("gemma", "google"),
+    ("gpt", "openai"),
+    ("openai", "openai"),
+    ("claude", "anthropic"),
+    ("anthropic", "anthropic"),
+)
+
+
+def _detect_provider(model: str) -> str:
+    """Map a model name to its provider tag ("google", "openai" or "anthropic")."""
+    name = model.lower()
+    return next(
+        (provider for marker, provider in _PROVIDER_MARKERS if marker in name),
+        "google",
+    )
+
+
+# One keep-alive connection pool shared by every Gemini/OpenAI/Anthropic client.
+# browser-use builds a fresh SDK client per request; without a shared
+# http_client each of those would open (and TLS-handshake) its own connections.
+_HTTP_CLIENT = None
+
+
+def _shared_http_client():
+    """
+    Return the process-wide httpx.AsyncClient (LLM_MAX_CONNECTIONS, default 20).
+
+    HTTP/2 is enabled when the optional h2 package is installed, so concurrent
+    agents multiplex their calls over one TLS connection per host.
+    """
+    global _HTTP_CLIENT
+    if _HTTP_CLIENT is None:
+        import httpx
+
+        max_connections = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+        _HTTP_CLIENT = httpx.AsyncClient(
+            http2=importlib.util.find_spec("h2") is not None,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
+    return _HTTP_CLIENT
+
+
+async def close_http_client() -> None:
+    """Close the shared LLM HTTP client (call on application shutdown)."""
+    global _HTTP_CLIENT
+    client, _HTTP_CLIENT = _HTTP_CLIENT, None
+    if client is not None:
+        await client.aclose()
+
+
+def _google_http_options():
+    """
+    google-genai HttpOptions that route Gemini calls through the shared client.
+
+    Returns None on google-genai versions without httpx_async_client support,
+    which then fall back to their own per-client connection pool.
     """
-    model_lower = model.lower()
-
-    if 'gemini' in model_lower or 'gemma' in model_lower:
-        from browser_use import ChatGoogle
-        key = api_key or os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-        if not key:
-            raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY not found in environment variables")
-        return ChatGoogle(model=model, temperature=temperature, api_key=key)
-
-    elif 'gpt' in model_lower or 'openai' in model_lower:
-        from browser_use.llm.openai.chat import ChatOpenAI
-        return ChatOpenAI(model=model, temperature=temperature)
-
-    elif 'claude' in model_lower or 'anthropic' in model_lower:
-        from browser_use.llm.anthropic.chat import ChatAnthropic
-        return ChatAnthropic(model=model, temperature=temperature)
-
-    else:
-        # Default to Gemini
-        from browser_use import ChatGoogle
-        key = api_key or os.getenv("GOOGLE_API_KEY") or os.getenv("GEMINI_API_KEY")
-        if not key:
-            raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY not found in environment variables")
-        return ChatGoogle(model=model, temperature=temperature, api_key=key)
+    from google.genai import types
+
+    if "httpx_async_client" not in types.HttpOptions.model_fields:
+        return None
+    return types.HttpOptions(httpx_async_client=_shared_http_client())
+
+
+def _make_google_chat(model: str, temperature: float, api_key: Optional[str]):
+    ChatGoogle = _load_provider("google")
+    key = api_key or _ENV_GEMINI_KEY
+    if not key:
+        raise ValueError("GEMINI_API_KEY or GOOGLE_API_KEY not found in environment variables")
+    return ChatGoogle(
+        model=model,
+        temperature=temperature,
+        api_key=key,
+        http_options=_google_http_options(),
+    )
+
+
+def _make_openai_chat(model: str, temperature: float, api_key: Optional[str]):
+    ChatOpenAI = _load_provider("openai")
+    return ChatOpenAI(
+        model=model,
+        temperature=temperature,
+        api_key=api_key or _ENV_OPENAI_KEY,
+        http_client=_shared_http_client(),
+    )
+
+
+def _make_anthropic_chat(model: str, temperature: float, api_key: Optional[str]):
+    ChatAnthropic = _load_provider("anthropic")
+    return ChatAnthropic(
+        model=model,
+        temperature=temperature,
+        api_key=api_key or _ENV_ANTHROPIC_KEY,
+        http_client=_shared_http_client(),
+    )
+
+
+_PROVIDERS = {
+    "google": _make_google_chat,
+    "openai": _make_openai_chat,
+    "anthropic": _make_anthropic_chat,
+}
+
+
+def _create_llm(model: str, temperature: float, api_key: Optional[str]):
+    """Instantiate a new LLM for the provider detected from the model name."""
+    provider = _detect_provider(model)
+    llm = _PROVIDERS[provider](model, temperature, api_key)
+    return _apply_rate_limit(llm, provider)
+
+
+# ============== Rate limiting ==============
+
+class AsyncTokenBucket:
+    """
+    Requests-per-minute / tokens-per-minute limiter shared by concurrent callers.
+
+    Both budgets refill continuously. acquire() waits until one request and the
+    estimated number of tokens are available; waiters are served in order.
+    """
+
+    def __init__(self, rpm: Optional[int] = None, tpm: Optional[int] = None):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm or 0)
+        self._tokens = float(tpm or 0)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.rpm:
+            self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        if self.tpm:
+            self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """Wait until a request with the given token estimate fits the budget."""
+        if self.tpm:
+            tokens = min(tokens, self.tpm)
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = 0.0
+                if self.rpm and self._requests < 1:
+                    wait = max(wait, (1 - self._requests) * 60 / self.rpm)
+                if self.tpm and self._tokens < tokens:
+                    wait = max(wait, (tokens - self._tokens) * 60 / self.tpm)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+
+            if self.rpm:
+                self._requests -= 1
+            if self.tpm:
+                self._tokens -= tokens
+
+
+# Provider -> env var prefix for <PREFIX>_RPM / <PREFIX>_TPM
+_RATE_LIMIT_ENV = {
+    "google": "GEMINI",
+    "openai": "OPENAI",
+    "anthropic": "ANTHROPIC",
+}
+
+# Provider -> shared bucket (None when no limits are configured)
+_RATE_LIMITERS: Dict[str, Optional[AsyncTokenBucket]] = {}
+
+
+def get_rate_limiter(provider: str) -> Optional[AsyncTokenBucket]:
+    """Get the shared rate limiter for a provider, configured from <PREFIX>_RPM/_TPM."""
+    if provider not in _RATE_LIMITERS:
+        prefix = _RATE_LIMIT_ENV[provider]
+        rpm = int(os.getenv(f"{prefix}_RPM") or 0)
+        tpm = int(os.getenv(f"{prefix}_TPM") or 0)
+        _RATE_LIMITERS[provider] = AsyncTokenBucket(rpm, tpm) if (rpm or tpm) else None
+    return _RATE_LIMITERS[provider]
+
+
+# Provider -> shared semaphore capping in-flight calls (None when unlimited)
+_CONCURRENCY_LIMITS: Dict[str, Optional[asyncio.Semaphore]] = {}
+
+
+def get_concurrency_limit(provider: str) -> Optional[asyncio.Semaphore]:
+    """Get the shared in-flight call cap for a provider, from <PREFIX>_MAX_CONCURRENCY."""
+    if provider not in _CONCURRENCY_LIMITS:
+        limit = int(os.getenv(f"{_RATE_LIMIT_ENV[provider]}_MAX_CONCURRENCY") or 0)
+        _CONCURRENCY_LIMITS[provider] = asyncio.Semaphore(limit) if limit else None
+    return _CONCURRENCY_LIMITS[provider]
+
+
+# Flat TPM charge per image part; providers bill screenshots at roughly this
+# size regardless of the length of their base64 data URL
+_IMAGE_TOKEN_ESTIMATE = 1000
+
+
+def _estimate_tokens(messages) -> int:
+    """Rough token estimate (~4 characters per text token) for TPM accounting."""
+    chars = 0
+    images = 0
+    for message in messages:
+        content = getattr(message, "content", message)
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        # List of content parts: count text, charge a flat rate per image
+        for part in content or ():
+            text = getattr(part, "text", None)
+            if isinstance(text, str):
+                chars += len(text)
+            elif getattr(part, "type", None) == "image_url":
+                images += 1
+    return chars // 4 + images * _IMAGE_TOKEN_ESTIMATE
+
+
+def _apply_rate_limit(llm, provider: str):
+    """Route the LLM's ainvoke() through the provider's shared rate and concurrency limits."""
+    bucket = get_rate_limiter(provider)
+    semaphore = get_concurrency_limit(provider)
+    if bucket is None and semaphore is None:
+        return llm
+
+    original_ainvoke = llm.ainvoke
+
+    async def ainvoke(messages, *args, **kwargs):
+        if bucket is not None:
+            await bucket.acquire(_estimate_tokens(messages))
+        if semaphore is None:
+            return await original_ainvoke(messages, *args, **kwargs)
+        async with semaphore:
+            return await original_ainvoke(messages, *args, **kwargs)
+
+    llm.ainvoke = ainvoke
+    return llm
@@ -7,12 +7,27 @@ to enable real-time progress updates in the frontend.
 
 import asyncio
 import json
-import uuid
+import time
+import secrets
+import weakref
+from collections import deque
 from datetime import datetime
-from typing import AsyncGenerator, Optional, Dict, Any
+from typing import AsyncGenerator, Deque, Optional, Dict, Any
 from dataclasses import dataclass, field
 from enum import Enum
 
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to stdlib json
+    orjson = None
+
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to UTF-8 JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, separators=(",", ":")).encode()
+
 
 class LogLevel(str, Enum):
     """Log severity levels."""
@@ -23,6 +38,16 @@ class LogLevel(str, Enum):
     DEBUG = "debug"
 
 
+# Severity order for StreamingSession.min_level filtering
+_LEVEL_RANK = {
+    LogLevel.DEBUG: 0,
+    LogLevel.INFO: 1,
+    LogLevel.SUCCESS: 1,
+    LogLevel.WARNING: 2,
+    LogLevel.ERROR: 3,
+}
+
+
 class EventType(str, Enum):
     """Types of streaming events."""
     STEP_START = "step_start"
@@ -35,30 +60,102 @@ class EventType(str, Enum):
     PROGRESS = "progress"
 
 
+# Pre-serialized '{"type":...,"level":...,' head of every SSE payload; to_sse()
+# only has to encode the per-event fields
+_SSE_PREFIXES: Dict[tuple, bytes] = {
+    (event_type, level): (
+        b'data: {"type":' + _dumps(event_type.value)
+        + b',"level":' + _dumps(level.value) + b","
+    )
+    for event_type in EventType
+    for level in LogLevel
+}
+
+
+# (whole epoch second, its local ISO form); events arrive in bursts within the
+# same second, so only the microseconds need formatting for most of them
+_iso_second: tuple = (None, "")
+
+
+def _iso_timestamp(timestamp: float) -> str:
+    """Local ISO 8601 time for an epoch timestamp, always with microseconds."""
+    global _iso_second
+    second = int(timestamp)
+    cached_second, base = _iso_second
+    if second != cached_second:
+        base = datetime.fromtimestamp(second).isoformat()
+        _iso_second = (second, base)
+    # Rounded like datetime.fromtimestamp(), but kept within the cached second
+    micros = min(round((timestamp - second) * 1_000_000), 999_999)
+    return f"{base}.{micros:06d}"
+
+
 @dataclass
 class StreamEvent:
     """A single streaming event."""
     event_type: EventType
     level: LogLevel
     message: str
-    timestamp: str = field(default_factory=lambda: datetime.now().isoformat())
+    timestamp: float = field(default_factory=time.time)  # epoch seconds, ISO-formatted in to_sse()
     data: Optional[Dict[str, Any]] = None
     step_number: Optional[int] = None
 
-    def to_sse(self) -> str:
-        """Convert to SSE format."""
+    def to_sse(self) -> bytes:
+        """Convert to an SSE frame, already encoded for the response body."""
+        prefix = _SSE_PREFIXES[self.event_type, self.level]
+        timestamp = _iso_timestamp(self.timestamp)
+
+        if not self.data:
+            # Common case: only the message needs real JSON encoding; the ISO
+            # timestamp and the step number never need escaping
+            step = b"null" if self.step_number is None else b"%d" % self.step_number
+            return b"".join((
+                prefix, b'"message":', _dumps(self.message),
+                b',"timestamp":"', timestamp.encode(), b'","step":', step, b"}\n\n",
+            ))
+
         event_data = {
-            "type": self.event_type.value,
-            "level": self.level.value,
             "message": self.message,
-            "timestamp": self.timestamp,
+            "timestamp": timestamp,
             "step": self.step_number,
+            "data": self.data,
         }
-        if self.data:
-            event_data["data"] = self.data
+        # SSE format: data: {json}\n\n - the cached prefix replaces the opening "{"
+        return prefix + _dumps(event_data)[1:] + b"\n\n"
+
+
+def sse_frame(data: Dict[str, Any]) -> bytes:
+    """Encode a JSON payload as one SSE "data:" frame."""
+    return b"data: " + _dumps(data) + b"\n\n"
+
 
-        # SSE format: data: {json}\n\n
-        return f"data: {json.dumps(event_data)}\n\n"
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    """Return the event loop running in this thread, if any."""
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+# Seconds without events before a heartbeat comment frame is sent, short enough
+# to stay under common proxy/load-balancer idle timeouts
+HEARTBEAT_INTERVAL = 15.0
+
+_HEARTBEAT = b": heartbeat\n\n"
+
+# Events buffered per session before low-priority events are dropped
+MAX_BUFFERED_EVENTS = 1024
+
+# Never dropped, even when the buffer is full
+_ESSENTIAL_EVENTS = frozenset({EventType.STEP_START, EventType.ERROR, EventType.DONE})
+
+# After an idle wait, events() holds off this long (or until this many events
+# are buffered) so a burst of small emits goes out as one chunk
+COALESCE_WINDOW = 0.02
+COALESCE_MAX_EVENTS = 16
+
+# Levels sent without waiting for the coalescing window
+_URGENT_LEVELS = frozenset({LogLevel.ERROR, LogLevel.SUCCESS})
 
 
 class StreamingSession:
@@ -69,11 +166,30 @@ class StreamingSession:
     as an async generator for SSE streaming.
     """
 
-    def __init__(self, session_id: Optional[str] = None):
-        self.session_id = session_id or str(uuid.uuid4())[:8]
-        self._queue: asyncio.Queue[StreamEvent] = asyncio.Queue()
+    def __init__(
+        self,
+        session_id: Optional[str] = None,
+        verbose: bool = False,
+        min_level: LogLevel = LogLevel.DEBUG,
+    ):
+        self.session_id = session_id or secrets.token_hex(4)
+        # Include full payloads (e.g. untruncated thinking) in event data
+        self.verbose = verbose
+        # Events below this level are discarded before an event object is built
+        # (step boundaries, errors and completion are always sent)
+        self.min_level = min_level
+        self._min_rank = _LEVEL_RANK[min_level]
+        # Single producer (agent callbacks), single consumer (events()): a deque
+        # plus one wake-up future is cheaper than asyncio.Queue's getter bookkeeping
+        self._buffer: Deque[StreamEvent] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._dropped = 0
+        # Sessions following this one's progress (see add_mirror)
+        self._mirrors: list = []
         self._is_running = True
         self._step_count = 0
+        # Loop that owns the buffer; emits from other threads are handed over to it
+        self._loop = _running_loop()
 
     def emit(
         self,
@@ -82,7 +198,10 @@ class StreamingSession:
         level: LogLevel = LogLevel.INFO,
         data: Optional[Dict[str, Any]] = None,
     ):
-        """Emit an event to the stream."""
+        """Emit an event to the stream. Safe to call from any thread."""
+        if _LEVEL_RANK[level] < self._min_rank and event_type not in _ESSENTIAL_EVENTS:
+            return
+
         event = StreamEvent(
             event_type=event_type,
             level=level,
@@ -90,7 +209,50 @@ class StreamingSession:
             data=data,
             step_number=self._step_count,
         )
-        self._queue.put_nowait(event)
+        self._in_loop(self._push, event)
+
+    def _in_loop(self, callback, *args):
+        """Run callback on the session's loop, hopping threads if needed (FIFO)."""
+        if self._loop is not None and _running_loop() is not self._loop:
+            self._loop.call_soon_threadsafe(callback, *args)
+        else:
+            callback(*args)
+
+    def _push(self, event: StreamEvent):
+        """Buffer an event and wake the consumer (event loop thread only)."""
+        # Followers get their own completion event from whoever runs them.
+        # They are served first: each has its own buffer bound, and they keep
+        # following after this session's client has gone
+        if self._mirrors and event.event_type is not EventType.DONE:
+            for mirror in self._mirrors:
+                mirror._push(event)
+
+        # Nothing drains a closed session's buffer any more
+        if not self._is_running:
+            return
+
+        # A slow or stalled client must not grow the buffer without bound
+        if len(self._buffer) >= MAX_BUFFERED_EVENTS and event.event_type not in _ESSENTIAL_EVENTS:
+            self._dropped += 1
+            return
+
+        self._buffer.append(event)
+        self._wake()
+
+    def add_mirror(self, session: "StreamingSession"):
+        """Copy this session's future events (except DONE) to another session."""
+        self._mirrors.append(session)
+
+    def remove_mirror(self, session: "StreamingSession"):
+        """Stop copying events to a session added with add_mirror()."""
+        if session in self._mirrors:
+            self._mirrors.remove(session)
+
+    def _wake(self):
+        """Resume events() if it is waiting for the next event."""
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
 
     def emit_info(self, message: str, data: Optional[Dict[str, Any]] = None):
         """Emit an info event."""
@@ -114,12 +276,12 @@ class StreamingSession:
         )
 
     def emit_thinking(self, thinking: str):
-        """Emit agent thinking event."""
+        """Emit agent thinking event (full text only in verbose sessions)."""
         self.emit(
             EventType.STEP_THINKING,
-            thinking[:200] + "..." if len(thinking) > 200 else thinking,
+            thinking if len(thinking) <= 200 else f"{thinking[:200]}...",
             LogLevel.DEBUG,
-            {"full_thinking": thinking}
+            {"full_thinking": thinking} if self.verbose else None
         )
 
     def emit_action(self, action_name: str, action_params: Optional[Dict] = None):
@@ -151,24 +313,47 @@ class StreamingSession:
             LogLevel.SUCCESS if success else LogLevel.ERROR,
             data
         )
-        self._is_running = False
+        self._in_loop(self._stop)
 
-    async def events(self) -> AsyncGenerator[str, None]:
+    async def events(self) -> AsyncGenerator[bytes, None]:
         """
-        Async generator that yields SSE-formatted events.
+        Async generator that yields SSE-formatted events as bytes.
 
         Use this with FastAPI's StreamingResponse.
         """
-        while self._is_running or not self._queue.empty():
+        while self._is_running or self._buffer:
             try:
-                event = await asyncio.wait_for(
-                    self._queue.get(),
-                    timeout=30.0  # Heartbeat timeout
-                )
-                yield event.to_sse()
-            except asyncio.TimeoutError:
-                # Send heartbeat to keep connection alive
-                yield ": heartbeat\n\n"
+                if self._buffer:
+                    if self._dropped:
+                        self._buffer.appendleft(StreamEvent(
+                            event_type=EventType.PROGRESS,
+                            level=LogLevel.WARNING,
+                            message=f"{self._dropped} events dropped (client fell behind)",
+                            step_number=self._step_count,
+                        ))
+                        self._dropped = 0
+
+                    # Send everything emitted since the last wake-up as one chunk
+                    frames = [event.to_sse() for event in self._buffer]
+                    self._buffer.clear()
+                    yield b"".join(frames)
+                    continue
+                if not self._is_running:
+                    break
+
+                self._waiter = asyncio.get_running_loop().create_future()
+                try:
+                    done, _ = await asyncio.wait(
+                        {self._waiter},
+                        timeout=HEARTBEAT_INTERVAL
+                    )
+                finally:
+                    self._waiter = None
+                if not done:
+                    # Send heartbeat to keep connection alive
+                    yield _HEARTBEAT
+                elif self._is_running and not self._flush_due():
+                    await asyncio.sleep(COALESCE_WINDOW)
             except Exception as e:
                 yield StreamEvent(
                     event_type=EventType.ERROR,
@@ -186,9 +371,21 @@ class StreamingSession:
                 message="Stream ended"
             ).to_sse()
 
+    def _flush_due(self) -> bool:
+        """True if buffered events should go out without coalescing."""
+        return (
+            len(self._buffer) >= COALESCE_MAX_EVENTS
+            or any(event.level in _URGENT_LEVELS for event in self._buffer)
+        )
+
     def close(self):
         """Close the streaming session."""
+        self._in_loop(self._stop)
+
+    def _stop(self):
+        """Mark the stream finished and let events() drain and exit."""
         self._is_running = False
+        self._wake()
 
 
 def create_step_callback(session: StreamingSession):
@@ -219,12 +416,24 @@ def create_step_callback(session: StreamingSession):
         # Emit actions
         if agent_output and agent_output.action:
             for action in agent_output.action:
-                action_name = type(action).__name__
-                # Try to get action params if available
+                # ActionModel sets exactly one field, named after the action
+                # (e.g. "click"); reading it avoids a full model walk
+                action_name = next(
+                    iter(getattr(action, 'model_fields_set', ())),
+                    type(action).__name__,
+                )
+                # Params only go to verbose sessions; dump just the set field,
+                # keeping the {action_name: params} shape of a full model_dump()
                 action_params = None
-                if hasattr(action, 'model_dump'):
+                if session.verbose:
+                    params = getattr(action, action_name, None)
                     try:
-                        action_params = action.model_dump(exclude_none=True)
+                        if hasattr(params, 'model_dump'):
+                            action_params = {action_name: params.model_dump(mode="json", exclude_none=True)}
+                        elif params is not None:
+                            action_params = {action_name: params}
+                        elif hasattr(action, 'model_dump'):
+                            action_params = action.model_dump(mode="json", exclude_none=True)
                     except Exception:
                         pass
                 session.emit_action(action_name, action_params)
@@ -263,7 +472,9 @@ def create_done_callback(session: StreamingSession):
 
 
 # Session registry for managing active streaming sessions
-_active_sessions: Dict[str, StreamingSession] = {}
+# Weak values: a session lives only as long as its SSE generator or running
+# task holds it, so sessions abandoned without remove_session() do not leak
+_active_sessions: "weakref.WeakValueDictionary[str, StreamingSession]" = weakref.WeakValueDictionary()
 
 
 def get_session(session_id: str) -> Optional[StreamingSession]:
@@ -271,15 +482,15 @@ def get_session(session_id: str) -> Optional[StreamingSession]:
     return _active_sessions.get(session_id)
 
 
-def create_session() -> StreamingSession:
+def create_session(verbose: bool = False, min_level: LogLevel = LogLevel.DEBUG) -> StreamingSession:
     """Create and register a new streaming session."""
-    session = StreamingSession()
+    session = StreamingSession(verbose=verbose, min_level=min_level)
     _active_sessions[session.session_id] = session
     return session
 
 
 def remove_session(session_id: str):
     """Remove a streaming session."""
-    if session_id in _active_sessions:
-        _active_sessions[session_id].close()
-        del _active_sessions[session_id]
+    session = _active_sessions.pop(session_id, None)
+    if session is not None:
+        session.close()
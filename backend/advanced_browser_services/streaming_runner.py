@@ -7,24 +7,179 @@ Runs browser-use agents with real-time log streaming via SSE.
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass
 from pathlib import Path
+import asyncio
+import contextlib
+import functools
 import json
+import logging
+import os
+import weakref
 from datetime import datetime
 
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to stdlib json
+    orjson = None
+
 from browser_use import Agent
 
-from ui_testing_agent import UITestingService, OutputConfig
+# UITestingService / AccessibilityAuditService (and the generators, explorer and
+# axe modules behind them) are imported inside the methods that use them, so
+# starting the server does not load them until the first such run
 from ui_testing_agent.core.browser_factory import BrowserFactory, BrowserResult
-from ui_testing_agent.a11y_service import AccessibilityAuditService
+from ui_testing_agent.core.browser_pool import get_browser_pool
+from ui_testing_agent.core.agent_retry import run_agent_with_retry
 from .llm_factory import get_llm, DEFAULT_MODEL
 from .streaming import (
+    LogLevel,
     StreamingSession,
     create_step_callback,
     create_session,
     remove_session,
 )
 
+logger = logging.getLogger(__name__)
+
+
+# Static prompt templates; only the task-specific fields are substituted per run
+_EXTRACTION_TASK = """
+        Go to {url} and extract the following data:
+        {schema_desc}
+
+        Extract up to {item_limit} items.
+        Collect all items visible on a page with a single extraction action,
+        not one action per item, and only move on to further pages if needed.
+        Return all the data together in a structured format in your final answer.
+        """
+
+_DEPTH_INSTRUCTIONS = {
+    "shallow": "Do a quick search and summarize the top results.",
+    "moderate": "Search multiple sources and provide a balanced overview.",
+    "deep": "Thoroughly research from multiple authoritative sources, cross-reference information.",
+}
+
+_RESEARCH_TASK = """
+        Research the topic: {topic}
+
+        Instructions:
+        - {depth_instruction}
+        - Consult up to {max_sources} different sources
+        - Take note of source URLs for citations
+        - Synthesize findings into a comprehensive summary
+        """
+
+_PRODUCT_COMPARISON_TASK = """
+        Compare the following products: {products}
+
+        For each product, find and compare:
+        {aspects}
+
+        Create a comparison table and provide a recommendation.
+        """
+
+_PAGE_COMPARISON_TASK = """
+        Compare the following web pages:
+        {url_list}
+
+        Focus on comparing: {comparison_criteria}
+
+        Each page is already open in its own tab, in the order listed; switch
+        between the tabs instead of navigating again, and create a detailed comparison.
+        """
+
+
+def _write_metadata(output_path: Path, metadata: Dict[str, Any]) -> None:
+    """Create the session output directory and write metadata.json (blocking)."""
+    output_path.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        (output_path / "metadata.json").write_bytes(
+            orjson.dumps(metadata, option=orjson.OPT_INDENT_2)
+        )
+    else:
+        (output_path / "metadata.json").write_text(json.dumps(metadata, indent=2))
+
+
+def _open_urls_actions(urls: List[str]) -> List[Dict[str, Dict[str, Any]]]:
+    """Build browser-use initial actions that open each URL in its own tab."""
+    return [
+        {"navigate": {"url": url, "new_tab": i > 0}}
+        for i, url in enumerate(urls)
+    ]
+
+
+class AgentAdmission:
+    """
+    Admission control for concurrent agent runs, resizable at runtime.
+
+    A Condition-guarded counter rather than asyncio.Semaphore: waiters re-check
+    the limit whenever it changes, so set_limit() takes effect immediately in
+    both directions without touching Semaphore internals.
+
+    Usage:
+        admission = AgentAdmission(4)
+        async with admission:
+            await agent.run()
+    """
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._active = 0
+        self._cv = asyncio.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def is_full(self) -> bool:
+        """True if a new run would have to wait."""
+        return self._active >= self._limit
+
+    async def set_limit(self, limit: int) -> None:
+        """Change the limit; extra waiters are admitted at once when raised."""
+        async with self._cv:
+            self._limit = limit
+            self._cv.notify_all()
+
+    async def __aenter__(self) -> "AgentAdmission":
+        async with self._cv:
+            await self._cv.wait_for(lambda: self._active < self._limit)
+            self._active += 1
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        async with self._cv:
+            self._active -= 1
+            # notify_all: on Python 3.11 a waiter cancelled after notify() swallows
+            # the wakeup; wait_for() re-checks the limit, so extra wakeups are harmless
+            self._cv.notify_all()
+
+
+def _admitted(method):
+    """Run a StreamingAgentRunner task inside the runner's admission limit."""
+    @functools.wraps(method)
+    async def wrapper(self, session: StreamingSession, *args, **kwargs):
+        if self.admission.is_full():
+            session.emit_info(
+                f"Waiting for a free agent slot ({self.admission.limit} agents running)..."
+            )
+        async with self.admission:
+            return await method(self, session, *args, **kwargs)
+    return wrapper
+
+
+@dataclass(slots=True)
+class _SharedRun:
+    """A basic task run shared by every session that submitted the same task."""
+    task: asyncio.Task
+    leader: StreamingSession
+    waiters: int = 0
+
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class StreamingTaskConfig:
     """Configuration for a streaming task."""
     task: str
@@ -54,17 +209,48 @@ class StreamingAgentRunner:
         self,
         model: str = DEFAULT_MODEL,
         temperature: float = 0.7,
+        max_concurrent_agents: Optional[int] = None,
     ):
+        """
+        Initialize the runner.
+
+        Args:
+            model: LLM model for all tasks
+            temperature: LLM temperature for all tasks
+            max_concurrent_agents: Agents allowed to run at once; further tasks
+                wait their turn (default: MAX_CONCURRENT_AGENTS env var, or 4)
+        """
         self.model = model
         self.temperature = temperature
-        self._sessions: Dict[str, StreamingSession] = {}
+        if max_concurrent_agents is None:
+            max_concurrent_agents = int(os.getenv("MAX_CONCURRENT_AGENTS") or 4)
+        self.admission = AgentAdmission(max_concurrent_agents)
+        self._sessions: weakref.WeakValueDictionary[str, StreamingSession] = (
+            weakref.WeakValueDictionary()
+        )
+        # Normalized basic task -> the run currently executing it
+        self._inflight: Dict[tuple, _SharedRun] = {}
 
-    def create_session(self) -> StreamingSession:
-        """Create a new streaming session."""
-        session = create_session()
+    def create_session(
+        self,
+        verbose: bool = False,
+        min_level: LogLevel = LogLevel.DEBUG,
+    ) -> StreamingSession:
+        """
+        Create a new streaming session.
+
+        Args:
+            verbose: Include full payloads (e.g. untruncated thinking) in events
+            min_level: Drop events below this level
+        """
+        session = create_session(verbose=verbose, min_level=min_level)
         self._sessions[session.session_id] = session
         return session
 
+    async def set_max_concurrent_agents(self, limit: int) -> None:
+        """Retune the concurrent agent limit at runtime."""
+        await self.admission.set_limit(limit)
+
     def get_session(self, session_id: str) -> Optional[StreamingSession]:
         """Get an active session."""
         return self._sessions.get(session_id)
@@ -75,19 +261,84 @@ class StreamingAgentRunner:
         task: str,
         max_steps: int = 30,
         headless: bool = False,
+        initial_urls: Optional[List[str]] = None,
     ) -> Dict[str, Any]:
         """
         Run a basic browser automation task with streaming.
 
+        Identical tasks submitted while one is already running share that run:
+        the later sessions follow its progress events and get its result
+        instead of launching another browser and LLM loop.
+
         Args:
             session: The streaming session to emit events to
             task: Natural language task description
             max_steps: Maximum number of steps
             headless: Run browser without UI
+            initial_urls: URLs opened (one tab each) before the first LLM step
 
         Returns:
             Final result dictionary
         """
+        # Followers see the leader's events, so only sessions that want the
+        # same payloads and levels may share a run
+        key = (
+            " ".join(task.split()), max_steps, headless, tuple(initial_urls or ()),
+            session.verbose, session.min_level,
+        )
+        shared = self._inflight.get(key)
+        if shared is None or shared.task.done() or shared.task.cancelling():
+            # No run to join (a run abandoned by all its waiters may still be
+            # unwinding; it must not be joined)
+            shared = _SharedRun(
+                asyncio.create_task(
+                    self._run_basic_task(session, task, max_steps, headless, initial_urls)
+                ),
+                session,
+            )
+            self._inflight[key] = shared
+            shared.task.add_done_callback(
+                functools.partial(self._forget_inflight, key, shared)
+            )
+        else:
+            session.emit_info(
+                f"Identical task already running (session {shared.leader.session_id}), "
+                "following its progress..."
+            )
+            shared.leader.add_mirror(session)
+
+        shared.waiters += 1
+        try:
+            result = await asyncio.shield(shared.task)
+        finally:
+            shared.waiters -= 1
+            shared.leader.remove_mirror(session)
+            if shared.waiters == 0:
+                # Nobody is listening any more; stop the run (no-op if finished)
+                # and wait for it to release its browser before this caller ends
+                shared.task.cancel()
+                with contextlib.suppress(asyncio.CancelledError):
+                    await shared.task
+
+        if session is not shared.leader:
+            session.emit_done(summary=result["summary"], success=result["success"])
+        return result
+
+    def _forget_inflight(self, key: tuple, shared: "_SharedRun", _task: asyncio.Task) -> None:
+        """Drop a finished run from _inflight unless a newer run took its key."""
+        if self._inflight.get(key) is shared:
+            del self._inflight[key]
+
+    @_admitted
+    async def _run_basic_task(
+        self,
+        session: StreamingSession,
+        task: str,
+        max_steps: int,
+        headless: bool,
+        initial_urls: Optional[List[str]],
+    ) -> Dict[str, Any]:
+        """Run a basic task for run_basic_task() (one run per set of identical tasks)."""
         session.emit_info("Initializing browser automation...")
         session.emit_info(f"Task: {task}")
 
@@ -97,9 +348,10 @@ class StreamingAgentRunner:
             llm = get_llm(model=self.model, temperature=self.temperature)
             session.emit_info(f"Using model: {self.model}")
 
-            # Create browser using BrowserFactory (single source of truth)
-            browser_result = await BrowserFactory.create(headless=headless)
-            session.emit_info(f"Browser initialized (strategy: {browser_result.strategy_used})")
+            # Borrow a warm browser from the shared pool
+            browser_pool = get_browser_pool(headless)
+            browser_result = await browser_pool.acquire()
+            session.emit_info(f"Browser ready (strategy: {browser_result.strategy_used})")
 
             # Build agent kwargs with browser based on type
             agent_kwargs = {
@@ -109,6 +361,10 @@ class StreamingAgentRunner:
                 "register_new_step_callback": create_step_callback(session),
             }
 
+            # Open known URLs up front instead of spending an LLM step on each
+            if initial_urls:
+                agent_kwargs["initial_actions"] = _open_urls_actions(initial_urls)
+
             # Add browser kwargs based on type from factory
             agent_kwargs.update(BrowserFactory.get_agent_kwargs(browser_result))
 
@@ -118,19 +374,7 @@ class StreamingAgentRunner:
             session.emit_info("Agent created, starting execution...")
 
             # Run agent
-            history = await agent.run(max_steps=max_steps)
-
-            # Extract results
-            steps = []
-            for step in history.history:
-                action_desc = "Processing"
-                if step.model_output and step.model_output.action:
-                    action_names = [type(a).__name__ for a in step.model_output.action]
-                    action_desc = ", ".join(action_names)
-                steps.append({
-                    "action": action_desc,
-                    "status": "done"
-                })
+            history = await run_agent_with_retry(agent, max_steps=max_steps)
 
             final_result = history.final_result() or "Task completed"
 
@@ -143,8 +387,8 @@ class StreamingAgentRunner:
             return {
                 "success": True,
                 "summary": final_result,
-                "steps": steps,
-                "total_steps": len(steps),
+                # Per-step details already went out as SSE events
+                "total_steps": len(history.history),
             }
 
         except Exception as e:
@@ -156,17 +400,18 @@ class StreamingAgentRunner:
             return {
                 "success": False,
                 "summary": f"Error: {str(e)}",
-                "steps": [],
+                "total_steps": 0,
                 "error": str(e),
             }
 
         finally:
             if browser_result:
                 try:
-                    await BrowserFactory.cleanup(browser_result)
-                    session.emit_info("Browser closed")
-                except Exception:
-                    pass
+                    await get_browser_pool(headless).release(browser_result)
+                    session.emit_info("Browser released")
+                except Exception as e:
+                    # Cancellation is not an Exception and propagates
+                    logger.warning(f"Browser release failed: {e!r}")
 
     async def run_data_extraction(
         self,
@@ -185,13 +430,11 @@ class StreamingAgentRunner:
 
         # Build extraction task
         schema_desc = ", ".join([f"{k}: {v}" for k, v in data_schema.items()])
-        task = f"""
-        Go to {url} and extract the following data:
-        {schema_desc}
-
-        Extract up to {max_items or 'all available'} items.
-        Return the data in a structured format.
-        """
+        task = _EXTRACTION_TASK.format(
+            url=url,
+            schema_desc=schema_desc,
+            item_limit=max_items or "all available",
+        )
 
         return await self.run_basic_task(session, task, max_steps, headless)
 
@@ -210,21 +453,11 @@ class StreamingAgentRunner:
         session.emit_info(f"Starting research on: {topic}")
         session.emit_info(f"Depth: {depth}, Max sources: {max_sources}")
 
-        depth_instructions = {
-            "shallow": "Do a quick search and summarize the top results.",
-            "moderate": "Search multiple sources and provide a balanced overview.",
-            "deep": "Thoroughly research from multiple authoritative sources, cross-reference information.",
-        }
-
-        task = f"""
-        Research the topic: {topic}
-
-        Instructions:
-        - {depth_instructions.get(depth, depth_instructions['moderate'])}
-        - Consult up to {max_sources} different sources
-        - Take note of source URLs for citations
-        - Synthesize findings into a comprehensive summary
-        """
+        task = _RESEARCH_TASK.format(
+            topic=topic,
+            depth_instruction=_DEPTH_INSTRUCTIONS.get(depth, _DEPTH_INSTRUCTIONS["moderate"]),
+            max_sources=max_sources,
+        )
 
         return await self.run_basic_task(session, task, max_steps, headless)
 
@@ -242,14 +475,10 @@ class StreamingAgentRunner:
         session.emit_info(f"Comparing products: {', '.join(products)}")
         session.emit_info(f"Aspects: {', '.join(aspects)}")
 
-        task = f"""
-        Compare the following products: {', '.join(products)}
-
-        For each product, find and compare:
-        {', '.join(aspects)}
-
-        Create a comparison table and provide a recommendation.
-        """
+        task = _PRODUCT_COMPARISON_TASK.format(
+            products=", ".join(products),
+            aspects=", ".join(aspects),
+        )
 
         return await self.run_basic_task(session, task, max_steps, headless)
 
@@ -267,17 +496,16 @@ class StreamingAgentRunner:
         session.emit_info(f"Comparing {len(urls)} pages")
         session.emit_info(f"Criteria: {comparison_criteria}")
 
-        task = f"""
-        Compare the following web pages:
-        {chr(10).join(f'- {url}' for url in urls)}
-
-        Focus on comparing: {comparison_criteria}
-
-        Open each page (you can use multiple tabs) and create a detailed comparison.
-        """
+        task = _PAGE_COMPARISON_TASK.format(
+            url_list="\n".join(f"- {url}" for url in urls),
+            comparison_criteria=comparison_criteria,
+        )
 
-        return await self.run_basic_task(session, task, max_steps, headless)
+        return await self.run_basic_task(
+            session, task, max_steps, headless, initial_urls=urls
+        )
 
+    @_admitted
     async def run_ui_testing_agent_task(
         self,
         session: StreamingSession,
@@ -291,6 +519,8 @@ class StreamingAgentRunner:
         This uses the UITestingService which generates artifacts (tests, reports)
         in addition to performing the automation.
         """
+        from ui_testing_agent import UITestingService, OutputConfig
+
         session.emit_info(f"Initializing UI Testing Agent...")
         session.emit_info(f"Task: {task}")
 
@@ -298,8 +528,6 @@ class StreamingAgentRunner:
         output_dir = f"./test_outputs/{session.session_id}"
 
         # Save session metadata with task for re-run capability
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
         metadata = {
             "session_id": session.session_id,
             "task": task,
@@ -307,7 +535,7 @@ class StreamingAgentRunner:
             "headless": headless,
             "created_at": datetime.now().isoformat(),
         }
-        (output_path / "metadata.json").write_text(json.dumps(metadata, indent=2))
+        await asyncio.to_thread(_write_metadata, Path(output_dir), metadata)
 
         config = OutputConfig(
             output_directory=output_dir,
@@ -324,6 +552,7 @@ class StreamingAgentRunner:
             output_config=config,
             model=self.model,
             headless=headless,
+            browser_pool=get_browser_pool(headless),
         )
         
         try:
@@ -370,6 +599,7 @@ class StreamingAgentRunner:
                 "error": str(e)
             }
 
+    @_admitted
     async def run_a11y_audit(
         self,
         session: StreamingSession,
@@ -384,6 +614,9 @@ class StreamingAgentRunner:
         Phase 1: axe-core automated scan
         Phase 2: AI behavioral accessibility testing (optional)
         """
+        from ui_testing_agent import OutputConfig
+        from ui_testing_agent.a11y_service import AccessibilityAuditService
+
         session.emit_info("Initializing Accessibility Audit...")
         session.emit_info(f"URL: {url}")
         if skip_behavioral:
@@ -391,8 +624,6 @@ class StreamingAgentRunner:
 
         # Setup output directory
         output_dir = f"./test_outputs/{session.session_id}"
-        output_path = Path(output_dir)
-        output_path.mkdir(parents=True, exist_ok=True)
         metadata = {
             "session_id": session.session_id,
             "type": "a11y_audit",
@@ -402,7 +633,7 @@ class StreamingAgentRunner:
             "skip_behavioral": skip_behavioral,
             "created_at": datetime.now().isoformat(),
         }
-        (output_path / "metadata.json").write_text(json.dumps(metadata, indent=2))
+        await asyncio.to_thread(_write_metadata, Path(output_dir), metadata)
 
         config = OutputConfig(
             output_directory=output_dir,
@@ -473,8 +704,7 @@ class StreamingAgentRunner:
 
     def cleanup_session(self, session_id: str):
         """Clean up a completed session."""
-        if session_id in self._sessions:
-            del self._sessions[session_id]
+        self._sessions.pop(session_id, None)
         remove_session(session_id)
 
 
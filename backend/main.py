@@ -5,23 +5,153 @@ if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8', errors='replace')
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi.responses import StreamingResponse, FileResponse, JSONResponse, ORJSONResponse
 from pydantic import BaseModel
 from pathlib import Path
+from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 import json
+import mimetypes
+import os
 import asyncio
+import anyio
+
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to stdlib json
+    orjson = None
+from advanced_browser_services.streaming import HEARTBEAT_INTERVAL, LogLevel, sse_frame
 from advanced_browser_services.streaming_runner import get_streaming_runner
+from advanced_browser_services.llm_factory import close_http_client
+from ui_testing_agent.core.browser_factory import BrowserFactory
+from ui_testing_agent.core.browser_pool import close_browser_pools, get_browser_pool
 
 load_dotenv()
 
-app = FastAPI()
+
+async def prewarm_browsers(app: FastAPI) -> None:
+    """
+    Pre-launch pooled browsers in the background when BROWSER_POOL_PREWARM=<count> is set.
+
+    Requests only draw from the pool matching their headless flag; set
+    BROWSER_POOL_PREWARM_HEADLESS=true to warm the headless pool instead of
+    the headed one (the request default).
+    """
+    count = int(os.getenv("BROWSER_POOL_PREWARM") or 0)
+    if count:
+        headless = os.getenv("BROWSER_POOL_PREWARM_HEADLESS", "").lower() in ("1", "true", "yes")
+        # Keep a reference so the task is not garbage collected mid-launch
+        app.state.prewarm_task = asyncio.create_task(
+            get_browser_pool(headless=headless).warm(count)
+        )
+
+
+async def shutdown_resources(app: FastAPI) -> None:
+    """Close pooled browsers, wait for background browser cleanups, close the LLM HTTP client."""
+    prewarm_task = getattr(app.state, "prewarm_task", None)
+    if prewarm_task is not None:
+        await asyncio.gather(prewarm_task, return_exceptions=True)
+    await close_browser_pools()
+    await BrowserFactory.drain_cleanups()
+    await close_http_client()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks."""
+    await prewarm_browsers(app)
+    try:
+        yield
+    finally:
+        await shutdown_resources(app)
+
+
+# orjson serializes responses straight to bytes when installed
+app = FastAPI(
+    default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+    lifespan=lifespan,
+)
 
 # Initialize streaming runner
 streaming_runner = get_streaming_runner()
 
+# Headers for every SSE response: no caching, and no proxy buffering, which
+# would hold events back until a block fills
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Disable nginx buffering
+}
+
+# Seconds between checks for a client that went away mid-stream
+DISCONNECT_POLL_INTERVAL = 1.0
+
+
+async def _cancel_on_disconnect(http_request: Request, task: asyncio.Task, on_disconnect) -> None:
+    """
+    Cancel a stream's background task as soon as its client disconnects.
+
+    StreamingResponse only notices a dead client on its next write, which can
+    be a heartbeat away; polling stops the browser and LLM work right away.
+    on_disconnect() is then called to end the event generator.
+    """
+    while not task.done():
+        if await http_request.is_disconnected():
+            task.cancel()
+            on_disconnect()
+            return
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def _cancel_and_wait(task: asyncio.Task) -> None:
+    """Cancel a stream's background task and wait until it has finished unwinding."""
+    task.cancel()
+    # Shielded: the response itself may be getting cancelled (client gone)
+    with anyio.CancelScope(shield=True):
+        await asyncio.gather(task, return_exceptions=True)
+
+
+def _session_stream(
+    http_request: Request,
+    run,
+    *,
+    verbose: bool = False,
+    min_level: LogLevel = LogLevel.DEBUG,
+    **kwargs,
+) -> StreamingResponse:
+    """
+    SSE response streaming a new session's events while run(session=..., **kwargs) executes.
+
+    verbose sessions get full payloads (e.g. untruncated agent thinking);
+    events below min_level are not sent.
+
+    Owns the whole lifecycle: the run starts with the response, is cancelled
+    when the client disconnects, and is cancelled and awaited before the
+    session is cleaned up, so its browser is released before the request ends.
+    """
+    session = streaming_runner.create_session(verbose=verbose, min_level=min_level)
+
+    async def event_generator():
+        task = asyncio.create_task(run(session=session, **kwargs))
+        watcher = asyncio.create_task(_cancel_on_disconnect(http_request, task, session.close))
+
+        try:
+            async for event in session.events():
+                yield event
+        finally:
+            watcher.cancel()
+            await _cancel_and_wait(task)
+            streaming_runner.cleanup_session(session.session_id)
+
+    return StreamingResponse(
+        event_generator(),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 # Enable CORS for frontend integration
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +159,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Relative-Path"],
 )
 
 from typing import List, Optional
@@ -41,6 +172,8 @@ class StreamingTaskRequest(BaseModel):
     task: str
     max_steps: int = 30
     headless: bool = False
+    verbose: bool = False
+    min_level: LogLevel = LogLevel.DEBUG
 
 
 class StreamingExtractRequest(BaseModel):
@@ -50,6 +183,8 @@ class StreamingExtractRequest(BaseModel):
     max_items: Optional[int] = None
     max_steps: int = 40
     headless: bool = False
+    verbose: bool = False
+    min_level: LogLevel = LogLevel.DEBUG
 
 
 class StreamingResearchRequest(BaseModel):
@@ -59,6 +194,8 @@ class StreamingResearchRequest(BaseModel):
     max_sources: int = 5
     max_steps: int = 50
     headless: bool = False
+    verbose: bool = False
+    min_level: LogLevel = LogLevel.DEBUG
 
 
 class StreamingCompareProductsRequest(BaseModel):
@@ -67,6 +204,8 @@ class StreamingCompareProductsRequest(BaseModel):
     aspects: List[str]
     max_steps: int = 60
     headless: bool = False
+    verbose: bool = False
+    min_level: LogLevel = LogLevel.DEBUG
 
 
 class StreamingComparePagesRequest(BaseModel):
@@ -75,195 +214,95 @@ class StreamingComparePagesRequest(BaseModel):
     comparison_criteria: str
     max_steps: int = 30
     headless: bool = False
+    verbose: bool = False
+    min_level: LogLevel = LogLevel.DEBUG
 
 
 @app.post("/stream/basic-task")
-async def stream_basic_task(request: StreamingTaskRequest):
+async def stream_basic_task(request: StreamingTaskRequest, http_request: Request):
     """
     Run a basic browser automation task with SSE streaming.
 
     Returns a Server-Sent Events stream with real-time progress updates.
     """
-    session = streaming_runner.create_session()
-
-    async def event_generator():
-        # Start the task in background
-        task_coro = streaming_runner.run_ui_testing_agent_task(
-            session=session,
-            task=request.task,
-            max_steps=request.max_steps,
-            headless=request.headless,
-        )
-
-        # Run task and stream events concurrently
-        task = asyncio.create_task(task_coro)
-
-        try:
-            async for event in session.events():
-                yield event
-        finally:
-            if not task.done():
-                task.cancel()
-            streaming_runner.cleanup_session(session.session_id)
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",  # Disable nginx buffering
-        }
+    return _session_stream(
+        http_request,
+        streaming_runner.run_ui_testing_agent_task,
+        task=request.task,
+        max_steps=request.max_steps,
+        headless=request.headless,
+        verbose=request.verbose,
+        min_level=request.min_level,
     )
 
 
 @app.post("/stream/extract-data")
-async def stream_extract_data(request: StreamingExtractRequest):
+async def stream_extract_data(request: StreamingExtractRequest, http_request: Request):
     """
     Extract data with SSE streaming.
     """
-    session = streaming_runner.create_session()
-
-    async def event_generator():
-        task_coro = streaming_runner.run_data_extraction(
-            session=session,
-            url=request.url,
-            data_schema=request.data_schema,
-            max_items=request.max_items,
-            max_steps=request.max_steps,
-            headless=request.headless,
-        )
-
-        task = asyncio.create_task(task_coro)
-
-        try:
-            async for event in session.events():
-                yield event
-        finally:
-            if not task.done():
-                task.cancel()
-            streaming_runner.cleanup_session(session.session_id)
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+    return _session_stream(
+        http_request,
+        streaming_runner.run_data_extraction,
+        url=request.url,
+        data_schema=request.data_schema,
+        max_items=request.max_items,
+        max_steps=request.max_steps,
+        headless=request.headless,
+        verbose=request.verbose,
+        min_level=request.min_level,
     )
 
 
 @app.post("/stream/research-topic")
-async def stream_research_topic(request: StreamingResearchRequest):
+async def stream_research_topic(request: StreamingResearchRequest, http_request: Request):
     """
     Research a topic with SSE streaming.
     """
-    session = streaming_runner.create_session()
-
-    async def event_generator():
-        task_coro = streaming_runner.run_research(
-            session=session,
-            topic=request.topic,
-            depth=request.depth,
-            max_sources=request.max_sources,
-            max_steps=request.max_steps,
-            headless=request.headless,
-        )
-
-        task = asyncio.create_task(task_coro)
-
-        try:
-            async for event in session.events():
-                yield event
-        finally:
-            if not task.done():
-                task.cancel()
-            streaming_runner.cleanup_session(session.session_id)
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+    return _session_stream(
+        http_request,
+        streaming_runner.run_research,
+        topic=request.topic,
+        depth=request.depth,
+        max_sources=request.max_sources,
+        max_steps=request.max_steps,
+        headless=request.headless,
+        verbose=request.verbose,
+        min_level=request.min_level,
     )
 
 
 @app.post("/stream/compare-products")
-async def stream_compare_products(request: StreamingCompareProductsRequest):
+async def stream_compare_products(request: StreamingCompareProductsRequest, http_request: Request):
     """
     Compare products with SSE streaming.
     """
-    session = streaming_runner.create_session()
-
-    async def event_generator():
-        task_coro = streaming_runner.run_product_comparison(
-            session=session,
-            products=request.products,
-            aspects=request.aspects,
-            max_steps=request.max_steps,
-            headless=request.headless,
-        )
-
-        task = asyncio.create_task(task_coro)
-
-        try:
-            async for event in session.events():
-                yield event
-        finally:
-            if not task.done():
-                task.cancel()
-            streaming_runner.cleanup_session(session.session_id)
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+    return _session_stream(
+        http_request,
+        streaming_runner.run_product_comparison,
+        products=request.products,
+        aspects=request.aspects,
+        max_steps=request.max_steps,
+        headless=request.headless,
+        verbose=request.verbose,
+        min_level=request.min_level,
     )
 
 
 @app.post("/stream/compare-pages")
-async def stream_compare_pages(request: StreamingComparePagesRequest):
+async def stream_compare_pages(request: StreamingComparePagesRequest, http_request: Request):
     """
     Compare pages with SSE streaming.
     """
-    session = streaming_runner.create_session()
-
-    async def event_generator():
-        task_coro = streaming_runner.run_page_comparison(
-            session=session,
-            urls=request.urls,
-            comparison_criteria=request.comparison_criteria,
-            max_steps=request.max_steps,
-            headless=request.headless,
-        )
-
-        task = asyncio.create_task(task_coro)
-
-        try:
-            async for event in session.events():
-                yield event
-        finally:
-            if not task.done():
-                task.cancel()
-            streaming_runner.cleanup_session(session.session_id)
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+    return _session_stream(
+        http_request,
+        streaming_runner.run_page_comparison,
+        urls=request.urls,
+        comparison_criteria=request.comparison_criteria,
+        max_steps=request.max_steps,
+        headless=request.headless,
+        verbose=request.verbose,
+        min_level=request.min_level,
     )
 
 
@@ -273,10 +312,12 @@ class StreamingA11yAuditRequest(BaseModel):
     max_steps: int = 40
     headless: bool = False
     skip_behavioral: bool = False
+    verbose: bool = False
+    min_level: LogLevel = LogLevel.DEBUG
 
 
 @app.post("/stream/a11y-audit")
-async def stream_a11y_audit(request: StreamingA11yAuditRequest):
+async def stream_a11y_audit(request: StreamingA11yAuditRequest, http_request: Request):
     """
     Run an accessibility audit with SSE streaming.
 
@@ -285,35 +326,15 @@ async def stream_a11y_audit(request: StreamingA11yAuditRequest):
 
     Returns real-time progress events and a final score/grade.
     """
-    session = streaming_runner.create_session()
-
-    async def event_generator():
-        task_coro = streaming_runner.run_a11y_audit(
-            session=session,
-            url=request.url,
-            max_steps=request.max_steps,
-            headless=request.headless,
-            skip_behavioral=request.skip_behavioral,
-        )
-
-        task = asyncio.create_task(task_coro)
-
-        try:
-            async for event in session.events():
-                yield event
-        finally:
-            if not task.done():
-                task.cancel()
-            streaming_runner.cleanup_session(session.session_id)
-
-    return StreamingResponse(
-        event_generator(),
-        media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+    return _session_stream(
+        http_request,
+        streaming_runner.run_a11y_audit,
+        url=request.url,
+        max_steps=request.max_steps,
+        headless=request.headless,
+        verbose=request.verbose,
+        min_level=request.min_level,
+        skip_behavioral=request.skip_behavioral,
     )
 
 
@@ -344,15 +365,10 @@ class SessionArtifacts(BaseModel):
     video: Optional[str] = None
 
 
-@app.get("/artifacts/{session_id}", response_model=SessionArtifacts)
-async def get_session_artifacts(session_id: str):
-    """
-    Get list of all artifacts for a session.
-    """
-    session_dir = TEST_OUTPUTS_DIR / session_id
-
-    if not session_dir.exists():
-        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+def _scan_session_artifacts(session_id: str) -> SessionArtifacts:
+    """List a session's artifacts (rescanned per call: files can be rewritten in place)."""
+    session_dir = str(TEST_OUTPUTS_DIR / session_id)
+    prefix_len = len(session_dir) + 1
 
     artifacts = []
     html_report = None
@@ -361,36 +377,46 @@ async def get_session_artifacts(session_id: str):
     screenshots = []
     video = None
 
-    # Walk through session directory
-    for item in session_dir.rglob("*"):
-        if item.is_file():
-            rel_path = item.relative_to(session_dir)
-            artifact_url = f"/artifacts/{session_id}/file/{rel_path.as_posix()}"
-
-            artifact = ArtifactInfo(
-                name=item.name,
-                type="file",
-                path=str(rel_path),
-                size=item.stat().st_size,
-                url=artifact_url,
-            )
-            artifacts.append(artifact)
-
-            # Categorize artifacts
-            if item.name == "report.html":
-                html_report = artifact_url
-            elif item.name == "report.json":
-                json_report = artifact_url
-            elif item.suffix == ".py" and item.name.startswith("test_"):
-                playwright_code = artifact_url
-            elif item.suffix == ".png":
-                screenshots.append(artifact_url)
-            elif item.suffix == ".gif":
-                video = artifact_url
+    # Walk through session directory (DirEntry caches the file type)
+    pending = [session_dir]
+    while pending:
+        with os.scandir(pending.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    pending.append(entry.path)
+                    continue
+                if not entry.is_file():
+                    continue
+
+                rel_path = entry.path[prefix_len:]
+                artifact_url = f"/artifacts/{session_id}/file/{rel_path.replace(os.sep, '/')}"
+                name = entry.name
+                suffix = os.path.splitext(name)[1]
+
+                artifact = ArtifactInfo(
+                    name=name,
+                    type="file",
+                    path=rel_path,
+                    size=entry.stat().st_size,
+                    url=artifact_url,
+                )
+                artifacts.append(artifact)
+
+                # Categorize artifacts
+                if name == "report.html":
+                    html_report = artifact_url
+                elif name == "report.json":
+                    json_report = artifact_url
+                elif suffix == ".py" and name.startswith("test_"):
+                    playwright_code = artifact_url
+                elif suffix == ".png":
+                    screenshots.append(artifact_url)
+                elif suffix == ".gif":
+                    video = artifact_url
 
     return SessionArtifacts(
         session_id=session_id,
-        output_directory=str(session_dir),
+        output_directory=session_dir,
         artifacts=artifacts,
         html_report=html_report,
         json_report=json_report,
@@ -400,6 +426,38 @@ async def get_session_artifacts(session_id: str):
     )
 
 
+@app.get("/artifacts/{session_id}", response_model=SessionArtifacts)
+async def get_session_artifacts(session_id: str):
+    """
+    Get list of all artifacts for a session.
+    """
+    session_dir = TEST_OUTPUTS_DIR / session_id
+
+    if not session_dir.exists():
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+
+    return _scan_session_artifacts(session_id)
+
+
+# Media types for generated artifacts; other suffixes fall back to mimetypes
+ARTIFACT_MEDIA_TYPES = {
+    ".html": "text/html",
+    ".json": "application/json",
+    ".py": "text/x-python",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".md": "text/markdown",
+    ".yaml": "text/yaml",
+    ".yml": "text/yaml",
+    ".feature": "text/plain",
+}
+
+# Files that should display inline (not trigger download)
+INLINE_ARTIFACT_SUFFIXES = frozenset({".html", ".png", ".gif", ".jpg", ".jpeg"})
+
+
 @app.get("/artifacts/{session_id}/file/{file_path:path}")
 async def get_artifact_file(session_id: str, file_path: str):
     """
@@ -415,25 +473,11 @@ async def get_artifact_file(session_id: str, file_path: str):
 
     # Determine media type
     suffix = file_full_path.suffix.lower()
-    media_types = {
-        ".html": "text/html",
-        ".json": "application/json",
-        ".py": "text/x-python",
-        ".png": "image/png",
-        ".gif": "image/gif",
-        ".jpg": "image/jpeg",
-        ".jpeg": "image/jpeg",
-        ".md": "text/markdown",
-        ".yaml": "text/yaml",
-        ".yml": "text/yaml",
-        ".feature": "text/plain",
-    }
-    media_type = media_types.get(suffix, "application/octet-stream")
+    media_type = ARTIFACT_MEDIA_TYPES.get(suffix)
+    if media_type is None:
+        media_type = mimetypes.guess_type(file_full_path.name)[0] or "application/octet-stream"
 
-    # Files that should display inline (not trigger download)
-    inline_types = {".html", ".png", ".gif", ".jpg", ".jpeg"}
-
-    if suffix in inline_types:
+    if suffix in INLINE_ARTIFACT_SUFFIXES:
         # Don't set filename for inline content - allows iframe/img display
         return FileResponse(
             path=file_full_path,
@@ -452,6 +496,9 @@ async def get_artifact_file(session_id: str, file_path: str):
 async def get_playwright_code(session_id: str):
     """
     Get the generated Playwright code content.
+
+    The file is sent as-is (text/x-python); its path relative to the outputs
+    directory is in the X-Relative-Path header.
     """
     session_dir = TEST_OUTPUTS_DIR / session_id / "tests"
 
@@ -464,58 +511,68 @@ async def get_playwright_code(session_id: str):
         raise HTTPException(status_code=404, detail="No test file found")
 
     test_file = test_files[0]
-    content = test_file.read_text(encoding="utf-8")
-
-    return {
-        "filename": test_file.name,
-        "content": content,
-        "path": str(test_file.relative_to(TEST_OUTPUTS_DIR)),
-    }
 
+    # Streamed from disk instead of being read and JSON-encoded in memory
+    return FileResponse(
+        path=test_file,
+        media_type="text/x-python",
+        filename=test_file.name,
+        headers={"X-Relative-Path": test_file.relative_to(TEST_OUTPUTS_DIR).as_posix()},
+    )
 
-@app.get("/sessions")
-async def list_sessions():
-    """
-    List all available test sessions.
-    """
-    if not TEST_OUTPUTS_DIR.exists():
-        return {"sessions": []}
 
+def _scan_sessions() -> List[dict]:
+    """Collect session info for every session directory, newest first (blocking)."""
     sessions = []
-    for item in TEST_OUTPUTS_DIR.iterdir():
-        if item.is_dir():
-            # Get session info
-            report_json = item / "reports" / "report.json"
-            metadata_file = item / "metadata.json"
+    # DirEntry answers is_dir() from the directory listing itself
+    with os.scandir(TEST_OUTPUTS_DIR) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
 
+            # Get session info
             session_info = {
-                "session_id": item.name,
-                "created_at": item.stat().st_mtime,
-                "has_report": report_json.exists(),
+                "session_id": entry.name,
+                "created_at": entry.stat().st_mtime,
+                "has_report": os.path.exists(
+                    os.path.join(entry.path, "reports", "report.json")
+                ),
                 "task": None,
                 "max_steps": None,
             }
 
-            # Read metadata if available
-            if metadata_file.exists():
-                try:
-                    metadata = json.loads(metadata_file.read_text())
-                    session_info["task"] = metadata.get("task")
-                    session_info["max_steps"] = metadata.get("max_steps")
-                    if metadata.get("created_at"):
-                        # Use metadata timestamp if available
-                        from datetime import datetime
-                        dt = datetime.fromisoformat(metadata["created_at"])
-                        session_info["created_at"] = dt.timestamp()
-                except Exception:
-                    pass
+            # Read metadata if available (a missing file just raises here,
+            # saving a separate exists() check)
+            try:
+                with open(os.path.join(entry.path, "metadata.json"), "rb") as f:
+                    metadata = (orjson or json).loads(f.read())
+                session_info["task"] = metadata.get("task")
+                session_info["max_steps"] = metadata.get("max_steps")
+                if metadata.get("created_at"):
+                    # Use metadata timestamp if available
+                    from datetime import datetime
+                    dt = datetime.fromisoformat(metadata["created_at"])
+                    session_info["created_at"] = dt.timestamp()
+            except Exception:
+                pass
 
             sessions.append(session_info)
 
     # Sort by creation time (newest first)
     sessions.sort(key=lambda x: x["created_at"], reverse=True)
+    return sessions
 
-    return {"sessions": sessions}
+
+@app.get("/sessions")
+async def list_sessions():
+    """
+    List all available test sessions.
+    """
+    if not TEST_OUTPUTS_DIR.exists():
+        return {"sessions": []}
+
+    # One worker-thread hop for the whole scan keeps the event loop free
+    return {"sessions": await asyncio.to_thread(_scan_sessions)}
 
 
 # ============== Replay Endpoints (using BrowserUseReplayer) ==============
@@ -555,25 +612,50 @@ class ReplaySessionInfo(BaseModel):
     recording_path: str
 
 
+# Recording file names, in order of preference
+_REPLAY_RECORDING_NAMES = ("replay_recording.json", "recording.json", "recorded_session.json")
+
+
 def _find_replay_recording(session_dir: Path) -> Optional[Path]:
     """Find replay recording file in session directory."""
+    # One directory listing instead of an exists() per candidate plus a glob
+    try:
+        with os.scandir(session_dir) as entries:
+            names = [entry.name for entry in entries]
+    except OSError:
+        return None
+
     # Check exact file names first
-    candidates = [
-        session_dir / "replay_recording.json",
-        session_dir / "recording.json",
-        session_dir / "recorded_session.json",
-    ]
-    for path in candidates:
-        if path.exists():
-            return path
+    present = set(names)
+    for name in _REPLAY_RECORDING_NAMES:
+        if name in present:
+            return session_dir / name
 
     # Also search for pattern-based names (replay_recording_*.json)
-    for path in session_dir.glob("replay_recording_*.json"):
-        return path
+    for name in names:
+        if name.startswith("replay_recording_") and name.endswith(".json"):
+            return session_dir / name
 
     return None
 
 
+# Recordings parsed at once by /replay/sessions (each load is a file read + JSON parse)
+REPLAY_LOAD_CONCURRENCY = 16
+
+
+def _find_replay_recordings() -> List[tuple]:
+    """(session_id, recording path) for every session directory with a recording (blocking)."""
+    recordings = []
+    with os.scandir(TEST_OUTPUTS_DIR) as entries:
+        for entry in entries:
+            if not entry.is_dir():
+                continue
+            recording_path = _find_replay_recording(Path(entry.path))
+            if recording_path:
+                recordings.append((entry.name, recording_path))
+    return recordings
+
+
 @app.get("/replay/sessions")
 async def list_replay_sessions():
     """
@@ -584,21 +666,30 @@ async def list_replay_sessions():
     if not TEST_OUTPUTS_DIR.exists():
         return {"sessions": [], "total": 0}
 
-    sessions = []
-    for item in TEST_OUTPUTS_DIR.iterdir():
-        if not item.is_dir():
-            continue
+    recordings = await asyncio.to_thread(_find_replay_recordings)
+
+    # Parse recordings concurrently in worker threads, a bounded number at a time
+    limit = asyncio.Semaphore(REPLAY_LOAD_CONCURRENCY)
+
+    async def load(recording_path: Path):
+        async with limit:
+            return await asyncio.to_thread(RecordedSession.load, str(recording_path))
+
+    loaded = await asyncio.gather(
+        *(load(recording_path) for _, recording_path in recordings),
+        return_exceptions=True,
+    )
 
-        recording_path = _find_replay_recording(item)
-        if not recording_path:
+    sessions = []
+    for (session_id, recording_path), recorded in zip(recordings, loaded, strict=True):
+        if isinstance(recorded, BaseException):
+            # Skip invalid recordings
             continue
 
         try:
-            # Load session to get metadata
-            recorded = RecordedSession.load(str(recording_path))
             # Use directory name as session_id (for API lookups)
             sessions.append(ReplaySessionInfo(
-                session_id=item.name,  # Use directory name, not recording's internal ID
+                session_id=session_id,  # Use directory name, not recording's internal ID
                 task=recorded.task,
                 initial_url=recorded.initial_url,
                 recorded_at=recorded.recorded_at,
@@ -742,8 +833,23 @@ async def run_replay(session_id: str, request: Optional[ReplayRequest] = None):
         await BrowserFactory.cleanup(browser_result)
 
 
+# Progress events buffered per replay stream; a slow client loses the oldest ones
+REPLAY_QUEUE_SIZE = 64
+
+
+def _put_dropping_oldest(queue: asyncio.Queue, event: dict) -> None:
+    """Enqueue without blocking, evicting the oldest event if the queue is full."""
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(event)
+
+
 @app.post("/stream/replay/{session_id}")
-async def stream_replay(session_id: str, request: Optional[ReplayRequest] = None):
+async def stream_replay(
+    session_id: str,
+    http_request: Request,
+    request: Optional[ReplayRequest] = None,
+):
     """
     Run replay with SSE streaming progress updates.
 
@@ -775,7 +881,7 @@ async def stream_replay(session_id: str, request: Optional[ReplayRequest] = None
             config=BrowserConfig(headless=request.headless, disable_security=True)
         )
         if browser_result.browser is None:
-            yield f"data: {json.dumps({'type': 'error', 'message': 'Could not create browser for replay'})}\n\n"
+            yield sse_frame({'type': 'error', 'message': 'Could not create browser for replay'})
             return
 
         browser_session = browser_result.browser
@@ -784,31 +890,31 @@ async def stream_replay(session_id: str, request: Optional[ReplayRequest] = None
         if browser_result.strategy_used == "browser_class":
             await browser_session.start()
 
+        task = None
+        watcher = None
         try:
             # Progress tracking via callbacks
-            progress_events = asyncio.Queue()
+            progress_events: asyncio.Queue = asyncio.Queue(maxsize=REPLAY_QUEUE_SIZE)
+
+            # The replayer calls these synchronously from its own coroutine, on
+            # this event loop, so they can enqueue directly
+            total_actions = len(recorded.actions)
 
             def on_step_start(step: int, action):
-                asyncio.get_event_loop().call_soon_threadsafe(
-                    progress_events.put_nowait,
-                    {
-                        "type": "step_start",
-                        "step": step,
-                        "action_type": action.action_type.value,
-                        "total": len(recorded.actions),
-                    }
-                )
+                _put_dropping_oldest(progress_events, {
+                    "type": "step_start",
+                    "step": step,
+                    "action_type": action.action_type.value,
+                    "total": total_actions,
+                })
 
             def on_step_complete(step: int, success: bool, error: Optional[str]):
-                asyncio.get_event_loop().call_soon_threadsafe(
-                    progress_events.put_nowait,
-                    {
-                        "type": "step_complete",
-                        "step": step,
-                        "success": success,
-                        "error": error,
-                    }
-                )
+                _put_dropping_oldest(progress_events, {
+                    "type": "step_complete",
+                    "step": step,
+                    "success": success,
+                    "error": error,
+                })
 
             replayer = BrowserUseReplayer(
                 on_step_start=on_step_start,
@@ -826,14 +932,24 @@ async def stream_replay(session_id: str, request: Optional[ReplayRequest] = None
                 await progress_events.put({"type": "complete", "result": result})
 
             task = asyncio.create_task(run_replay_task())
+            watcher = asyncio.create_task(_cancel_on_disconnect(
+                http_request,
+                task,
+                lambda: _put_dropping_oldest(progress_events, {"type": "disconnected"}),
+            ))
 
             # Send initial event
-            yield f"data: {json.dumps({'type': 'started', 'session_id': session_id, 'total_actions': len(recorded.actions)})}\n\n"
+            yield sse_frame({'type': 'started', 'session_id': session_id, 'total_actions': len(recorded.actions)})
 
             # Stream progress events
             while True:
                 try:
-                    event = await asyncio.wait_for(progress_events.get(), timeout=60.0)
+                    event = await asyncio.wait_for(
+                        progress_events.get(), timeout=HEARTBEAT_INTERVAL
+                    )
+
+                    if event["type"] == "disconnected":
+                        break
 
                     if event["type"] == "complete":
                         result = event["result"]
@@ -847,29 +963,30 @@ async def stream_replay(session_id: str, request: Optional[ReplayRequest] = None
                             "errors": result.errors,
                             "duration_seconds": result.duration_seconds,
                         }
-                        yield f"data: {json.dumps(final_data)}\n\n"
+                        yield sse_frame(final_data)
                         break
                     else:
-                        yield f"data: {json.dumps(event)}\n\n"
+                        yield sse_frame(event)
 
                 except asyncio.TimeoutError:
-                    # Send keepalive
-                    yield f"data: {json.dumps({'type': 'keepalive'})}\n\n"
+                    # Same SSE comment heartbeat as the session streams; clients skip it
+                    yield b": heartbeat\n\n"
 
         except Exception as e:
-            yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
+            yield sse_frame({'type': 'error', 'message': str(e)})
 
         finally:
+            # Stop the replay before closing the browser it is driving
+            if watcher is not None:
+                watcher.cancel()
+            if task is not None:
+                await _cancel_and_wait(task)
             await BrowserFactory.cleanup(browser_result)
 
     return StreamingResponse(
         event_generator(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "X-Accel-Buffering": "no",
-        }
+        headers=SSE_HEADERS,
     )
 
 
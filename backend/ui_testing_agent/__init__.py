@@ -46,30 +46,70 @@ Quick usage:
     )
 """
 
-# Main service
-from .service import UITestingService, run_ui_test
-
-# Models - public API
-from .models.output_config import OutputConfig
-from .models.test_session import TestSession
-from .models.test_scenario import TestScenario
-from .models.processed_step import ProcessedStep
-from .models.processed_action import ProcessedAction
-from .models.selector_info import SelectorInfo
-
-# Core components
-from .core.explorer_agent import ExplorerAgent, DEFAULT_MODEL
-from .core.browser_factory import (
-    BrowserFactory,
-    BrowserResult,
-    BrowserConfig,
-    BrowserInitializationError,
-)
-
-# Generators
-from .generators.playwright_generator import PlaywrightGenerator
-from .generators.test_case_generator import TestCaseGenerator
-from .generators.report_generator import ReportGenerator
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .service import UITestingService, run_ui_test
+    from .models.output_config import OutputConfig
+    from .models.test_session import TestSession
+    from .models.test_scenario import TestScenario
+    from .models.processed_step import ProcessedStep
+    from .models.processed_action import ProcessedAction
+    from .models.selector_info import SelectorInfo
+    from .core.explorer_agent import ExplorerAgent, DEFAULT_MODEL
+    from .core.browser_factory import (
+        BrowserFactory,
+        BrowserResult,
+        BrowserConfig,
+        BrowserInitializationError,
+    )
+    from .core.browser_pool import BrowserPool, get_browser_pool, close_browser_pools
+    from .generators.playwright_generator import PlaywrightGenerator
+    from .generators.test_case_generator import TestCaseGenerator
+    from .generators.report_generator import ReportGenerator
+
+
+# Exported name -> submodule, imported on first attribute access (PEP 562)
+_LAZY = {
+    # Main service
+    "UITestingService": ".service",
+    "run_ui_test": ".service",
+
+    # Models - public API
+    "OutputConfig": ".models.output_config",
+    "TestSession": ".models.test_session",
+    "TestScenario": ".models.test_scenario",
+    "ProcessedStep": ".models.processed_step",
+    "ProcessedAction": ".models.processed_action",
+    "SelectorInfo": ".models.selector_info",
+
+    # Core components
+    "ExplorerAgent": ".core.explorer_agent",
+    "DEFAULT_MODEL": ".core.explorer_agent",
+    "BrowserFactory": ".core.browser_factory",
+    "BrowserResult": ".core.browser_factory",
+    "BrowserConfig": ".core.browser_factory",
+    "BrowserInitializationError": ".core.browser_factory",
+    "BrowserPool": ".core.browser_pool",
+    "get_browser_pool": ".core.browser_pool",
+    "close_browser_pools": ".core.browser_pool",
+
+    # Generators
+    "PlaywrightGenerator": ".generators.playwright_generator",
+    "TestCaseGenerator": ".generators.test_case_generator",
+    "ReportGenerator": ".generators.report_generator",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __version__ = "0.1.0"
 
@@ -97,6 +137,9 @@ __all__ = [
     "BrowserResult",
     "BrowserConfig",
     "BrowserInitializationError",
+    "BrowserPool",
+    "get_browser_pool",
+    "close_browser_pools",
 
     # Generators
     "PlaywrightGenerator",
@@ -2,10 +2,43 @@
 Core components for UI Testing Agent.
 """
 
-from .selector_extractor import SelectorExtractor
-from .step_processor import StepProcessor
-from .explorer_agent import ExplorerAgent
-from .browser_factory import BrowserFactory, BrowserResult, BrowserConfig, BrowserInitializationError
+import importlib
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from .selector_extractor import SelectorExtractor
+    from .step_processor import StepProcessor
+    from .explorer_agent import ExplorerAgent
+    from .browser_factory import BrowserFactory, BrowserResult, BrowserConfig, BrowserInitializationError
+    from .browser_pool import BrowserPool, get_browser_pool, close_browser_pools
+    from .agent_retry import run_agent_with_retry, is_transient_error
+
+
+# Exported name -> submodule, imported on first attribute access (PEP 562)
+_LAZY = {
+    "SelectorExtractor": ".selector_extractor",
+    "StepProcessor": ".step_processor",
+    "ExplorerAgent": ".explorer_agent",
+    "BrowserFactory": ".browser_factory",
+    "BrowserResult": ".browser_factory",
+    "BrowserConfig": ".browser_factory",
+    "BrowserInitializationError": ".browser_factory",
+    "BrowserPool": ".browser_pool",
+    "get_browser_pool": ".browser_pool",
+    "close_browser_pools": ".browser_pool",
+    "run_agent_with_retry": ".agent_retry",
+    "is_transient_error": ".agent_retry",
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 
 __all__ = [
     "SelectorExtractor",
@@ -15,4 +48,9 @@ __all__ = [
     "BrowserResult",
     "BrowserConfig",
     "BrowserInitializationError",
+    "BrowserPool",
+    "get_browser_pool",
+    "close_browser_pools",
+    "run_agent_with_retry",
+    "is_transient_error",
 ]
@@ -5,30 +5,24 @@ Mirrors ExplorerAgent with accessibility-focused system prompt.
 Optionally reuses a browser session from Phase 1 (axe scan).
 """
 
-import os
 from datetime import datetime
 from typing import Optional, Any
 from uuid import uuid4
 
-from dotenv import load_dotenv
-
-load_dotenv()
-
-if os.getenv("GEMINI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
-    os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
+# Loads .env and normalizes API key names before browser-use is imported
+from advanced_browser_services.llm_factory import get_llm, DEFAULT_MODEL
 
 from browser_use import Agent
 from browser_use.agent.views import AgentHistoryList
 
 from ..models.output_config import OutputConfig
-from .browser_factory import BrowserFactory, BrowserResult
+from .browser_factory import BrowserConfig, BrowserFactory, BrowserResult
 from ..models.processed_step import ProcessedStep
 from ..models.test_session import TestSession
 from .step_processor import StepProcessor
 from ..prompts.a11y_auditor_prompt import build_a11y_system_prompt
 from .browser_use_replay import BrowserUseRecorder, RecordedSession
-
-from advanced_browser_services.llm_factory import get_llm, DEFAULT_MODEL
+from .agent_retry import run_agent_with_retry
 
 
 class A11yAgent:
@@ -106,6 +100,7 @@ class A11yAgent:
                 browser_profile = BrowserProfile(
                     cdp_url=self.cdp_url,
                     headless=self.headless,
+                    keep_alive=True,
                 )
                 browser_session = BrowserSession(browser_profile=browser_profile)
                 self._browser_result = BrowserResult(
@@ -114,7 +109,11 @@ class A11yAgent:
                     strategy_used="cdp_url",
                 )
             else:
-                self._browser_result = await BrowserFactory.create(headless=self.headless)
+                # keep_alive: a retried agent.run() (run_agent_with_retry) must find
+                # the browser still open; close() shuts it down
+                self._browser_result = await BrowserFactory.create(
+                    config=BrowserConfig(headless=self.headless, keep_alive=True)
+                )
             self._owns_browser = True
 
         # Attach recorder
@@ -147,7 +146,7 @@ class A11yAgent:
         self.current_agent = agent
 
         try:
-            history: AgentHistoryList = await agent.run(max_steps=max_steps)
+            history: AgentHistoryList = await run_agent_with_retry(agent, max_steps=max_steps)
 
             if self._recorder and self._recorder._is_recording:
                 self._recorded_session = self._recorder.detach()
@@ -221,5 +220,6 @@ class A11yAgent:
     async def close(self):
         """Close browser only if this agent created it."""
         if self._owns_browser and self._browser_result:
-            await BrowserFactory.cleanup(self._browser_result)
-            self._browser_result = None
+            browser_result, self._browser_result = self._browser_result, None
+            # Awaited: callers may terminate Chrome or exit the loop right after
+            await BrowserFactory.cleanup(browser_result)
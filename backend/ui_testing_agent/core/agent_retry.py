@@ -0,0 +1,94 @@
+"""
+Agent Retry - Exponential backoff around browser-use agent runs.
+
+Rate limits (HTTP 429) and transient provider/network failures should not
+throw away a whole browser session. run_agent_with_retry() retries only those
+errors, with exponential backoff and jitter; everything else is re-raised
+immediately.
+"""
+
+import asyncio
+import logging
+import random
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Status codes worth retrying (browser-use provider errors carry .status_code)
+TRANSIENT_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# Fallback for exceptions that only describe the failure in their message
+TRANSIENT_MESSAGE_MARKERS = (
+    "429",
+    "rate limit",
+    "ratelimit",
+    "resource_exhausted",
+    "resource exhausted",
+    "overloaded",
+    "unavailable",
+    "timed out",
+)
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """Return True if the error looks like a rate limit or transient failure."""
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+
+    if getattr(error, "status_code", None) in TRANSIENT_STATUS_CODES:
+        return True
+
+    message = str(error).lower()
+    return any(marker in message for marker in TRANSIENT_MESSAGE_MARKERS)
+
+
+def _steps_taken(agent: Any) -> int:
+    """Steps the agent has completed so far (browser-use numbers steps from 1)."""
+    state = getattr(agent, "state", None)
+    return max(getattr(state, "n_steps", 1) - 1, 0)
+
+
+async def run_agent_with_retry(
+    agent: Any,
+    max_steps: int,
+    attempts: int = 3,
+    base_delay: float = 1.0,
+) -> Any:
+    """
+    Run a browser-use Agent, retrying transient failures.
+
+    Waits base_delay * 2**attempt plus up to 250ms of jitter between attempts.
+    A retry resumes the same Agent with only the steps still left of max_steps,
+    so its history is kept and the step (and LLM call) budget is not reset.
+    The browser survives a failed attempt only if it was launched with
+    keep_alive; otherwise agent.run() has already closed it.
+
+    Args:
+        agent: The browser-use Agent to run
+        max_steps: Maximum agent steps across all attempts
+        attempts: Total number of attempts
+        base_delay: Delay in seconds before the first retry
+
+    Returns:
+        The AgentHistoryList from the successful attempt
+
+    Raises:
+        The last error if it is not transient or attempts are exhausted
+    """
+    for attempt in range(attempts):
+        remaining = max_steps - _steps_taken(agent)
+        try:
+            return await agent.run(max_steps=remaining)
+        except Exception as e:
+            if (
+                attempt == attempts - 1
+                or not is_transient_error(e)
+                or _steps_taken(agent) >= max_steps
+            ):
+                raise
+            delay = base_delay * 2 ** attempt + random.uniform(0, 0.25)
+            logger.warning(
+                f"Agent run failed with transient error ({e}); "
+                f"retrying in {delay:.2f}s (attempt {attempt + 2}/{attempts})"
+            )
+            await asyncio.sleep(delay)
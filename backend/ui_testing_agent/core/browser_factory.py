@@ -11,22 +11,27 @@ This ensures:
 - Single point of maintenance for browser-related issues
 """
 
+import asyncio
 import logging
 import os
-from dataclasses import dataclass, field
-from typing import Any, Optional, List, Dict
+from dataclasses import dataclass
+from typing import Any, Optional, List, Dict, Set, Tuple
 
 from browser_use import Browser
 
 logger = logging.getLogger(__name__)
 
+# Cleanups scheduled by BrowserFactory.cleanup_in_background(); holding a
+# reference keeps the tasks from being garbage-collected before they finish.
+_cleanup_tasks: Set[asyncio.Task] = set()
+
 
 class BrowserInitializationError(Exception):
     """Raised when all browser initialization strategies fail."""
     pass
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BrowserResult:
     """
     Result from browser factory initialization.
@@ -41,23 +46,28 @@ class BrowserResult:
     strategy_used: str
 
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BrowserConfig:
     """
     Configuration options for browser instantiation.
 
+    Frozen and hashable so it can key caches such as the browser pools; use
+    dataclasses.replace() to derive a modified config.
+
     Attributes:
         headless: Run browser without visible window
         disable_security: Disable browser security features (use with caution)
         extra_args: Additional command-line arguments for Chromium
         window_width: Browser window width in pixels
         window_height: Browser window height in pixels
+        keep_alive: Keep the browser running after an Agent finishes (for pooling)
     """
     headless: bool = False
     disable_security: bool = False
-    extra_args: List[str] = field(default_factory=list)
+    extra_args: Tuple[str, ...] = ()
     window_width: int = 1280
     window_height: int = 900
+    keep_alive: bool = False
 
 
 class BrowserFactory:
@@ -196,7 +206,7 @@ class BrowserFactory:
         except ImportError as e:
             raise ImportError(f"browser-use BrowserSession not available: {e}")
 
-        browser_profile = BrowserProfile(headless=config.headless)
+        browser_profile = BrowserProfile(headless=config.headless, keep_alive=config.keep_alive)
         browser_session = BrowserSession(browser_profile=browser_profile)
 
         # This is the key fix - explicitly start the session to initialize CDP
@@ -227,7 +237,10 @@ class BrowserFactory:
             kwargs["disable_security"] = True
 
         if config.extra_args:
-            kwargs["extra_chromium_args"] = config.extra_args
+            kwargs["extra_chromium_args"] = list(config.extra_args)
+
+        if config.keep_alive:
+            kwargs["keep_alive"] = True
 
         browser = Browser(**kwargs)
 
@@ -251,7 +264,7 @@ class BrowserFactory:
         except ImportError as e:
             raise ImportError(f"browser-use BrowserSession not available: {e}")
 
-        browser_profile = BrowserProfile(headless=config.headless)
+        browser_profile = BrowserProfile(headless=config.headless, keep_alive=config.keep_alive)
         browser_session = BrowserSession(browser_profile=browser_profile)
 
         # Check if context manager is supported
@@ -304,13 +317,17 @@ class BrowserFactory:
                 if result.strategy_used == "context_manager":
                     # Exit the context manager properly
                     await result.browser.__aexit__(None, None, None)
-                else:
+                # kill() also ends keep_alive browsers, which stop()/close() leave running
+                elif hasattr(result.browser, 'kill'):
+                    await result.browser.kill()
+                elif hasattr(result.browser, 'stop'):
                     # Use stop() for regular session
-                    if hasattr(result.browser, 'stop'):
-                        await result.browser.stop()
+                    await result.browser.stop()
             elif result.browser_type == "browser":
-                # Browser class uses close()
-                if hasattr(result.browser, 'close'):
+                if hasattr(result.browser, 'kill'):
+                    await result.browser.kill()
+                elif hasattr(result.browser, 'close'):
+                    # Browser class uses close()
                     await result.browser.close()
 
             logger.debug(f"Browser cleanup completed (strategy: {result.strategy_used})")
@@ -318,6 +335,35 @@ class BrowserFactory:
         except Exception as e:
             logger.warning(f"Error during browser cleanup: {e}")
 
+    @staticmethod
+    def cleanup_in_background(result: BrowserResult) -> Optional[asyncio.Task]:
+        """
+        Schedule cleanup() without waiting for it.
+
+        Browser teardown can take hundreds of milliseconds; use this when the
+        caller has nothing left to do with the browser and should not block on
+        shutting it down. Call drain_cleanups() on application shutdown.
+
+        Args:
+            result: The BrowserResult to clean up (must not be used afterwards)
+
+        Returns:
+            The scheduled task, or None if there was nothing to clean up
+        """
+        if not result or not result.browser:
+            return None
+
+        task = asyncio.create_task(BrowserFactory.cleanup(result))
+        _cleanup_tasks.add(task)
+        task.add_done_callback(_cleanup_tasks.discard)
+        return task
+
+    @staticmethod
+    async def drain_cleanups() -> None:
+        """Wait for all cleanups scheduled with cleanup_in_background()."""
+        if _cleanup_tasks:
+            await asyncio.gather(*list(_cleanup_tasks), return_exceptions=True)
+
     @staticmethod
     def get_agent_kwargs(result: BrowserResult) -> Dict[str, Any]:
         """
@@ -0,0 +1,257 @@
+"""
+Browser Pool - Reuse warm browsers across agent runs.
+
+Launching Chromium costs seconds and dominates short tasks. The pool keeps
+browsers created by BrowserFactory alive between runs and hands them out
+again, recycling each instance after a fixed number of uses.
+
+Browsers are still created and destroyed exclusively through BrowserFactory.
+"""
+
+import asyncio
+import dataclasses
+import logging
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+
+from .browser_factory import BrowserConfig, BrowserFactory, BrowserResult
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPool:
+    """
+    Pool of pre-launched browsers shared by sequential and concurrent runs.
+
+    Browsers are launched with keep_alive=True so that browser-use's Agent
+    does not kill them at the end of agent.run(). When a browser is returned
+    (reset_between_uses), extra tabs are closed and cookies, cache and site
+    storage are cleared, much like a keep-alive connection reused with fresh
+    request state; a browser that cannot be reset is discarded, and recycling
+    after max_uses_per_instance bounds whatever other state remains.
+
+    Usage:
+        pool = BrowserPool(BrowserConfig(headless=True), max_size=4)
+
+        result = await pool.acquire()
+        try:
+            agent = Agent(..., **BrowserFactory.get_agent_kwargs(result))
+            await agent.run()
+        finally:
+            await pool.release(result)
+
+        # Optionally, at startup
+        await pool.warm()
+
+        # On shutdown
+        await pool.close()
+    """
+
+    def __init__(
+        self,
+        config: Optional[BrowserConfig] = None,
+        max_size: int = 4,
+        max_uses_per_instance: int = 50,
+        reset_between_uses: bool = True,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            config: Browser configuration for every pooled instance
+            max_size: Maximum number of idle browsers kept warm
+            max_uses_per_instance: Recycle a browser after this many acquisitions
+            reset_between_uses: Close extra tabs and clear cookies, cache and
+                storage before reusing a browser
+        """
+        config = config or BrowserConfig()
+        self.config = dataclasses.replace(config, keep_alive=True)
+        self.max_size = max_size
+        self.max_uses_per_instance = max_uses_per_instance
+        self.reset_between_uses = reset_between_uses
+
+        self._idle: asyncio.Queue[BrowserResult] = asyncio.Queue(maxsize=max_size)
+        self._uses: Dict[int, int] = {}
+        self._closed = False
+
+    async def acquire(self) -> BrowserResult:
+        """Return an idle browser, launching a new one if none is available."""
+        try:
+            result = self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            result = await BrowserFactory.create(config=self.config)
+            self._uses[id(result)] = 0
+
+        self._uses[id(result)] += 1
+        return result
+
+    async def warm(self, count: Optional[int] = None) -> int:
+        """
+        Launch browsers concurrently so the first acquisitions skip Chromium startup.
+
+        Args:
+            count: Number of browsers to pre-launch (default: fill the pool)
+
+        Returns:
+            Number of browsers added to the pool
+        """
+        free = self.max_size - self._idle.qsize()
+        count = free if count is None else min(count, free)
+        if self._closed or count <= 0:
+            return 0
+
+        results = await asyncio.gather(
+            *(BrowserFactory.create(config=self.config) for _ in range(count)),
+            return_exceptions=True,
+        )
+
+        added = 0
+        for result in results:
+            if isinstance(result, BaseException):
+                logger.warning(f"Browser pre-warm failed: {result}")
+                continue
+            if self._closed or result.browser is None or self._idle.full():
+                BrowserFactory.cleanup_in_background(result)
+                continue
+            self._uses[id(result)] = 0
+            self._idle.put_nowait(result)
+            added += 1
+
+        logger.debug(f"Pre-warmed {added} browser(s)")
+        return added
+
+    async def release(self, result: BrowserResult, reusable: bool = True) -> None:
+        """
+        Return a browser to the pool, or clean it up.
+
+        Args:
+            result: The BrowserResult obtained from acquire()
+            reusable: False if the browser is known to be broken
+        """
+        uses = self._uses.get(id(result), 0)
+        if (
+            reusable
+            and not self._closed
+            and result.browser is not None
+            and uses < self.max_uses_per_instance
+            and (not self.reset_between_uses or await self._reset(result))
+        ):
+            try:
+                self._idle.put_nowait(result)
+                return
+            except asyncio.QueueFull:
+                pass
+
+        self._uses.pop(id(result), None)
+        BrowserFactory.cleanup_in_background(result)
+
+    @staticmethod
+    async def _reset(result: BrowserResult) -> bool:
+        """
+        Return the browser to a clean state for an unrelated next user.
+
+        Closes every tab but one and points that tab at about:blank (browser-use
+        shows the open tabs to the next agent's LLM), clears cookies and cache,
+        and clears site storage (localStorage, sessionStorage, IndexedDB, ...)
+        for every origin in the open tabs' navigation history or cookie jar.
+
+        Returns:
+            False if the browser could not be reset and should not be reused
+        """
+        session = result.browser
+        cdp = session.cdp_client.send
+        try:
+            targets = (await cdp.Target.getTargets())["targetInfos"]
+            pages = [t["targetId"] for t in targets if t.get("type") == "page"]
+            if not pages:
+                return False
+            keep, extra = pages[0], pages[1:]
+
+            origins = set()
+            for target_id in pages:
+                cdp_session = await session.get_or_create_cdp_session(
+                    target_id=target_id, focus=False
+                )
+                history = await cdp.Page.getNavigationHistory(
+                    session_id=cdp_session.session_id,
+                )
+                for entry in history["entries"]:
+                    origin = _origin(entry.get("url", ""))
+                    if origin:
+                        origins.add(origin)
+
+            # Sites visited in tabs that were already closed usually left cookies
+            for cookie in (await cdp.Storage.getCookies())["cookies"]:
+                host = cookie["domain"].lstrip(".")
+                origins.add(f"https://{host}")
+                if not cookie.get("secure"):
+                    origins.add(f"http://{host}")
+
+            for target_id in extra:
+                await cdp.Target.closeTarget(params={"targetId": target_id})
+
+            cdp_session = await session.get_or_create_cdp_session(target_id=keep, focus=True)
+            await cdp.Page.navigate(
+                params={"url": "about:blank"},
+                session_id=cdp_session.session_id,
+            )
+            for origin in origins:
+                await cdp.Storage.clearDataForOrigin(
+                    params={"origin": origin, "storageTypes": "all"},
+                )
+            for method in ("clearBrowserCookies", "clearBrowserCache"):
+                await getattr(cdp.Network, method)(session_id=cdp_session.session_id)
+            return True
+        except Exception as e:
+            logger.debug(f"Browser reset failed, discarding instance: {e}")
+            return False
+
+    async def close(self) -> None:
+        """Clean up all idle browsers. Browsers released later are cleaned up too."""
+        self._closed = True
+        while not self._idle.empty():
+            result = self._idle.get_nowait()
+            self._uses.pop(id(result), None)
+            await BrowserFactory.cleanup(result)
+        logger.debug("Browser pool closed")
+
+
+def _origin(url: str) -> Optional[str]:
+    """scheme://host[:port] of an http(s) URL, or None for other URLs."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.netloc:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+# Process-wide pools, one per browser configuration
+_pools: Dict[BrowserConfig, BrowserPool] = {}
+
+
+def get_browser_pool(
+    headless: bool = False,
+    config: Optional[BrowserConfig] = None,
+) -> BrowserPool:
+    """
+    Get or create the process-wide browser pool for a configuration.
+
+    Args:
+        headless: Run browsers without visible window (ignored if config provided)
+        config: Full browser configuration (overrides headless param)
+    """
+    if config is None:
+        config = BrowserConfig(headless=headless)
+
+    pool = _pools.get(config)
+    if pool is None:
+        pool = BrowserPool(config)
+        _pools[config] = pool
+    return pool
+
+
+async def close_browser_pools() -> None:
+    """Close all process-wide browser pools (call on application shutdown)."""
+    pools = list(_pools.values())
+    _pools.clear()
+    for pool in pools:
+        await pool.close()
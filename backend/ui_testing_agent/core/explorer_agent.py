@@ -4,25 +4,21 @@ Explorer Agent - Main agent for exploratory UI testing.
 Updated for browser-use 0.11.x API.
 """
 
-import os
 from datetime import datetime
 from typing import Optional, Any
 from uuid import uuid4
 
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
-
-# Handle API key naming (GEMINI_API_KEY -> GOOGLE_API_KEY)
-if os.getenv("GEMINI_API_KEY") and not os.getenv("GOOGLE_API_KEY"):
-    os.environ["GOOGLE_API_KEY"] = os.getenv("GEMINI_API_KEY")
+# Import unified LLM factory first: it loads .env and normalizes API key names
+# (single source of truth - no circular imports)
+from advanced_browser_services.llm_factory import get_llm, DEFAULT_MODEL
 
 from browser_use import Agent
 from browser_use.agent.views import AgentHistoryList
 
 from ..models.output_config import OutputConfig
-from .browser_factory import BrowserFactory, BrowserResult
+from .browser_factory import BrowserConfig, BrowserFactory, BrowserResult
+from .browser_pool import BrowserPool
+from .agent_retry import run_agent_with_retry
 from ..models.processed_step import ProcessedStep
 from ..models.test_session import TestSession
 from .step_processor import StepProcessor
@@ -31,9 +27,6 @@ from ..prompts.qa_engineer_prompt import build_qa_system_prompt
 # Import replay system for automatic recording during agent execution
 from .browser_use_replay import BrowserUseRecorder, RecordedSession
 
-# Import unified LLM factory (single source of truth - no circular imports)
-from advanced_browser_services.llm_factory import get_llm, DEFAULT_MODEL
-
 
 class ExplorerAgent:
     """
@@ -43,6 +36,13 @@ class ExplorerAgent:
     1. Injects a QA engineer mindset via system prompt
     2. Records all steps during execution
     3. Processes history into structured test session
+
+    The browser is created lazily on the first run and reused by subsequent
+    runs on the same instance. explore_and_test() does not close it; use the
+    agent as an async context manager or call close() when done:
+
+        async with ExplorerAgent(headless=True) as agent:
+            session = await agent.explore_and_test(task=..., url=...)
     """
 
     def __init__(
@@ -53,6 +53,7 @@ class ExplorerAgent:
         output_config: Optional[OutputConfig] = None,
         step_callback: Optional[Any] = None,
         done_callback: Optional[Any] = None,
+        browser_pool: Optional[BrowserPool] = None,
     ):
         """
         Initialize the explorer agent.
@@ -64,6 +65,8 @@ class ExplorerAgent:
             output_config: Configuration for output generation
             step_callback: Optional async callback for step updates
             done_callback: Optional async callback for completion
+            browser_pool: Optional pool to borrow the browser from instead of
+                launching a dedicated one
         """
         self.model = model
         self.temperature = temperature
@@ -71,6 +74,7 @@ class ExplorerAgent:
         self.output_config = output_config or OutputConfig()
         self.step_callback = step_callback
         self.done_callback = done_callback
+        self.browser_pool = browser_pool
 
         self.llm = get_llm(model=model, temperature=temperature)
         self._browser_result: Optional[BrowserResult] = None
@@ -115,8 +119,7 @@ class ExplorerAgent:
         self._recorded_session = None
         started_at = datetime.now()
 
-        # Create browser using the factory (single source of truth)
-        self._browser_result = await BrowserFactory.create(headless=self.headless)
+        await self._ensure_browser()
 
         # Attach recorder to capture actions for offline replay
         # This records all browser-use actions via event bus for LLM-free replay later
@@ -153,7 +156,7 @@ class ExplorerAgent:
 
         try:
             # Execute exploration and testing
-            history: AgentHistoryList = await agent.run(max_steps=max_steps)
+            history: AgentHistoryList = await run_agent_with_retry(agent, max_steps=max_steps)
 
             # Detach recorder and capture the recorded session for offline replay
             if self._recorder and self._recorder._is_recording:
@@ -210,10 +213,6 @@ class ExplorerAgent:
 
             raise
 
-        finally:
-            # Close browser session
-            await self.close()
-
     async def _on_step(self, state, output, step_num: int):
         """
         Callback: Called after each agent step.
@@ -254,8 +253,36 @@ class ExplorerAgent:
                 processed = self.step_processor.process_step(step, i)
                 self.recorded_steps.append(processed)
 
+    async def _ensure_browser(self) -> BrowserResult:
+        """Create the browser on first use and reuse it for later runs."""
+        if self._browser_result is None:
+            if self.browser_pool is not None:
+                self._browser_result = await self.browser_pool.acquire()
+            else:
+                # Create browser using the factory (single source of truth);
+                # keep_alive so Agent.run() leaves it running for the next run
+                self._browser_result = await BrowserFactory.create(
+                    config=BrowserConfig(headless=self.headless, keep_alive=True)
+                )
+        return self._browser_result
+
+    async def __aenter__(self) -> "ExplorerAgent":
+        await self._ensure_browser()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
     async def close(self):
-        """Close the browser and cleanup resources."""
-        if self._browser_result:
-            await BrowserFactory.cleanup(self._browser_result)
-            self._browser_result = None
+        """Close the browser (or return it to the pool) and cleanup resources."""
+        # A failed run leaves the recorder attached; stop it before the browser is reused
+        if self._recorder and self._recorder._is_recording:
+            self._recorder.detach()
+
+        browser_result, self._browser_result = self._browser_result, None
+        if browser_result:
+            if self.browser_pool is not None:
+                await self.browser_pool.release(browser_result)
+            else:
+                # Awaited: callers (e.g. scripts under asyncio.run) may exit right after
+                await BrowserFactory.cleanup(browser_result)
@@ -6,9 +6,15 @@ import os
 import shutil
 from typing import Optional, Any
 
+try:
+    import orjson
+except ImportError:  # optional speedup, falls back to stdlib json
+    orjson = None
+
 from .models.output_config import OutputConfig
 from .models.test_session import TestSession
 from .core.explorer_agent import ExplorerAgent, DEFAULT_MODEL
+from .core.browser_pool import BrowserPool
 from .generators.playwright_generator import PlaywrightGenerator
 from .generators.verified_playwright_generator import VerifiedPlaywrightGenerator
 from .generators.test_case_generator import TestCaseGenerator
@@ -43,6 +49,7 @@ class UITestingService:
         output_config: Optional[OutputConfig] = None,
         model: str = DEFAULT_MODEL,
         headless: bool = False,
+        browser_pool: Optional[BrowserPool] = None,
     ):
         """
         Initialize the UI Testing Service.
@@ -51,10 +58,12 @@ class UITestingService:
             output_config: Configuration for output generation
             model: LLM model to use (default: gemini-3-pro-preview)
             headless: Run browser without visible window
+            browser_pool: Optional pool to borrow browsers from
         """
         self.output_config = output_config or OutputConfig()
         self.model = model
         self.headless = headless
+        self.browser_pool = browser_pool
 
         # Initialize generators
         self.playwright_generator = PlaywrightGenerator(self.output_config)
@@ -92,16 +101,15 @@ class UITestingService:
         Returns:
             TestSession with all processed data and artifact paths
         """
-        # Create explorer agent
-        agent = ExplorerAgent(
+        # Create explorer agent (closes or releases its browser on exit)
+        async with ExplorerAgent(
             model=self.model,
             headless=self.headless,
             output_config=self.output_config,
             step_callback=step_callback,
             done_callback=done_callback,
-        )
-
-        try:
+            browser_pool=self.browser_pool,
+        ) as agent:
             # Execute exploration and testing
             session = await agent.explore_and_test(
                 task=task,
@@ -110,13 +118,10 @@ class UITestingService:
                 max_actions_per_step=max_actions_per_step,
             )
 
-            # Generate all artifacts
-            await self._generate_artifacts(session)
+        # Generate all artifacts
+        await self._generate_artifacts(session)
 
-            return session
-
-        finally:
-            await agent.close()
+        return session
 
     async def _generate_artifacts(self, session: TestSession):
         """Generate all configured output artifacts."""
@@ -259,11 +264,20 @@ class UITestingService:
 
     def _save_raw_history(self, session: TestSession, output_dir: str) -> str:
         """Save raw AgentHistoryList as JSON."""
-        import json
-
         filepath = os.path.join(output_dir, "raw_history.json")
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(session.raw_history, f, indent=2, default=str)
+
+        if orjson is not None:
+            with open(filepath, "wb") as f:
+                f.write(orjson.dumps(
+                    session.raw_history,
+                    default=str,
+                    option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+                ))
+        else:
+            import json
+
+            with open(filepath, "w", encoding="utf-8") as f:
+                json.dump(session.raw_history, f, indent=2, default=str)
 
         return filepath
 
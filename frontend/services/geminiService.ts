@@ -314,7 +314,13 @@ export const getPlaywrightCode = async (sessionId: string): Promise<PlaywrightCo
         throw new Error(`Failed to get code: ${response.statusText}`);
     }
 
-    return response.json();
+    // The file is served raw; its relative path comes in a header
+    const path = response.headers.get('X-Relative-Path') ?? '';
+    return {
+        filename: path.split('/').pop() ?? '',
+        content: await response.text(),
+        path,
+    };
 };
 
 export const listSessions = async (): Promise<{ sessions: SessionInfo[] }> => {